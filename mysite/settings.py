@@ -46,12 +46,16 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'polls.middleware.StaticFilesMiddleware',
+    'polls.middleware.AdmissionControlMiddleware',
+    'polls.middleware.ProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'polls.middleware.LoginPoolFullMiddleware',
 ]
 
 ROOT_URLCONF = 'mysite.urls'
@@ -85,6 +89,22 @@ DATABASES = {
     }
 }
 
+# Optional read replica for the index and results pages: point
+# POLLS_REPLICA_DB at a second SQLite file and refresh it with
+# `manage.py sync_replica`.
+if os.environ.get('POLLS_REPLICA_DB'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['POLLS_REPLICA_DB'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['polls.routers.ReplicaRouter']
+POLLS_READ_REPLICA = 'replica'
+
+# After voting, a user's reads stay on the primary for this many seconds.
+POLLS_REPLICA_PIN_SECONDS = 30
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
@@ -119,17 +139,132 @@ USE_L10N = True
 USE_TZ = True
 
 
+# Logging
+# https://docs.djangoproject.com/en/3.1/topics/logging/
+# Configured once by django.setup() instead of at import time of a module.
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'ku-polls': {
+            'handlers': ['console'],
+            'level': os.environ.get('POLLS_LOG_LEVEL', 'INFO'),
+        },
+        'polls': {
+            'handlers': ['console'],
+            'level': os.environ.get('POLLS_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/3.1/howto/static-files/
 
 STATIC_URL = '/static/'
-STATICFILES_DIRS = [ 
-	os.path.join(BASE_DIR, 'static'),
+STATICFILES_DIRS = [
+    path for path in [os.path.join(BASE_DIR, 'static')] if os.path.isdir(path)
 ]
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# collectstatic writes content-hashed names plus .gz/.br copies.
+STATICFILES_STORAGE = 'polls.storage.CompressedManifestStaticFilesStorage'
+
+# Serve STATIC_ROOT from the app itself, for deployments without a proxy.
+POLLS_SERVE_STATIC = os.environ.get('POLLS_SERVE_STATIC') == '1'
 
 AUTHENTICATION_BACKENDS = (
-    # username/password authentication
-'django.contrib.auth.backends.ModelBackend',  
+    # username/password authentication, hashed on a bounded thread pool
+    'polls.auth.PooledModelBackend',
 )
 
+PASSWORD_HASHERS = [
+    # Handles every pbkdf2_sha256 hash; listing Django's own hasher as well
+    # would shadow it, since the last hasher for an algorithm name wins.
+    'polls.auth.ConfigurablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+# PBKDF2 cost for new and upgraded password hashes.
+POLLS_PASSWORD_ITERATIONS = int(os.environ.get('POLLS_PASSWORD_ITERATIONS', 216000))
+
+# Password checks run on this many threads; up to POLLS_LOGIN_POOL_QUEUE more
+# may wait, further logins get a 503 straight away.
+POLLS_LOGIN_POOL_WORKERS = 2
+POLLS_LOGIN_POOL_QUEUE = 8
+POLLS_LOGIN_POOL_TIMEOUT = 10
+
+# Requests allowed per client as (requests, seconds), keyed by IP and user.
+POLLS_RATE_LIMITS = {
+    'vote': (30, 60),
+    'login': (10, 60),
+}
+POLLS_RATE_LIMIT_MAX_KEYS = 10000
+
+# Keep vote tallies in a shared memory block that every worker process on the
+# host updates, writing them back to Choice.votes every few seconds.
+# One int64 pair per slot; choices with larger ids fall back to the database.
+POLLS_SHARED_TALLY = os.environ.get('POLLS_SHARED_TALLY') == '1'
+POLLS_SHARED_TALLY_NAME = 'ku-polls-tally'
+POLLS_SHARED_TALLY_SLOTS = 65536
+POLLS_SHARED_TALLY_FLUSH_SECONDS = 5
+
+# The admin changelist counts at most this many rows for its paginator.
+POLLS_ADMIN_COUNT_LIMIT = 10000
+
+# `manage.py archive_votes` moves the votes of polls closed longer than this
+# into compressed per-poll files in POLLS_ARCHIVE_DIR.
+POLLS_ARCHIVE_AFTER_DAYS = 90
+POLLS_ARCHIVE_DIR = BASE_DIR / 'archive'
+
+# Request profiling: requests with a signed X-Polls-Profile header (see
+# `manage.py profile_view --token`) or a random sample are profiled into
+# POLLS_PROFILE_DIR, keeping the newest POLLS_PROFILE_KEEP captures.
+# Set POLLS_PROFILE_DIR to None to turn the middleware off.
+POLLS_PROFILE_DIR = BASE_DIR / 'profiles'
+POLLS_PROFILE_SAMPLE_RATE = float(os.environ.get('POLLS_PROFILE_SAMPLE_RATE', 0))
+POLLS_PROFILE_KEEP = 50
+POLLS_PROFILE_TOKEN_MAX_AGE = 24 * 60 * 60
+
+# Admission control: (max requests in flight, max seconds queued) per route
+# class, within POLLS_ADMISSION_CAPACITY requests in flight in total. When
+# the shared capacity is full, freed slots go to queued ballots before
+# logins and to logins before reads; requests that cannot get a slot in
+# time get 503 with Retry-After.
+POLLS_ADMISSION = {
+    'vote': (8, 2.0),
+    'login': (4, 0.5),
+    'read': (16, 0.25),
+}
+POLLS_ADMISSION_PRIORITY = ['vote', 'login', 'read']
+POLLS_ADMISSION_CAPACITY = 20
+POLLS_ADMISSION_RETRY_AFTER = 1
+
+# Vote forms carry a one-time key; a repeated submission within this many
+# seconds gets the original redirect without touching the database.
+POLLS_IDEMPOTENCY_TTL = 10 * 60
+POLLS_IDEMPOTENCY_MAX_KEYS = 10000
+
+# Polls per page of full-text search results.
+POLLS_SEARCH_PAGE_SIZE = 20
+
+# Trending polls: a vote's weight halves every POLLS_TRENDING_HALF_LIFE
+# seconds. Changing it invalidates the stored keys (they are rebuilt as new
+# votes arrive). Pending votes are written every few seconds.
+POLLS_TRENDING_HALF_LIFE = 60 * 60
+POLLS_TRENDING_FLUSH_SECONDS = 5
+
+# The in-memory "already voted" bitsets are reloaded from the database in a
+# background thread once they are this many seconds old, to pick up votes
+# cast in other workers.
+POLLS_VOTED_MAX_AGE = 60
+
 LOGIN_REDIRECT_URL = '/polls/'
\ No newline at end of file
@@ -16,9 +16,12 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
+from polls.views import PooledLoginView
+
 urlpatterns = [
     path('', include('polls.urls'), name="Home"),
     path('polls/', include('polls.urls')),
     path('admin/', admin.site.urls),
+    path('accounts/login/', PooledLoginView.as_view(), name='login'),
     path('accounts/', include('django.contrib.auth.urls'))
 ]
@@ -1,13 +1,65 @@
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.views.main import PAGE_VAR
+from django.core.paginator import Paginator
+from django.db.models import BooleanField, ExpressionWrapper, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.forms.models import BaseInlineFormSet
+from django.utils import timezone
+from django.utils.functional import cached_property
 
 from .models import Choice, Question
 
 
+class CappedCountPaginator(Paginator):
+    """Paginator that stops counting rows at POLLS_ADMIN_COUNT_LIMIT.
+
+    Past the limit the count only reaches one page beyond ``page_number``,
+    so every page stays reachable and the page links grow as the user
+    pages forward, like a "more pages" link.
+    """
+
+    def __init__(self, *args, page_number=1, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.page_number = page_number
+
+    @cached_property
+    def count(self):
+        """Count rows up to the limit or the page after the current one, skipping annotations and ordering."""
+        limit = max(settings.POLLS_ADMIN_COUNT_LIMIT, (self.page_number + 1) * self.per_page)
+        return self.object_list.order_by().values('pk')[:limit].count()
+
+
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """Inline formset that only loads and edits one page of objects."""
+
+    per_page = 50
+    page_number = 1
+
+    def get_queryset(self):
+        """Return the objects on the requested page."""
+        if not hasattr(self, 'page_obj'):
+            queryset = super().get_queryset()
+            self.page_obj = Paginator(queryset, self.per_page).get_page(self.page_number)
+            self._queryset = queryset.filter(pk__in=[obj.pk for obj in self.page_obj.object_list])
+        return self._queryset
+
+
 class ChoiceInline(admin.TabularInline):
     """Choices of each questions."""
 
     model = Choice
     extra = 3
+    formset = PaginatedInlineFormSet
+    template = 'admin/polls/edit_inline/tabular_paginated.html'
+    per_page = 50
+
+    def get_formset(self, request, obj=None, **kwargs):
+        """Show the page of choices given by ?choice_page=."""
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.per_page = self.per_page
+        formset.page_number = request.GET.get('choice_page', 1)
+        return formset
 
 
 class QuestionAdmin(admin.ModelAdmin):
@@ -18,8 +70,43 @@ class QuestionAdmin(admin.ModelAdmin):
         ('Date information', {'fields': ('pub_date', 'end_date'), 'classes': ['collapse']}),
     ]
     inlines = [ChoiceInline]
-    list_display = ('question_text', 'pub_date', 'was_published_recently')
+    list_display = ('question_text', 'pub_date', 'total_votes', 'is_open')
     list_filter = ['pub_date']
+    search_fields = ['^question_text']
+    paginator = CappedCountPaginator
+    show_full_result_count = False
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        """Tell the paginator which page is wanted so its count can reach it."""
+        try:
+            page_number = int(request.GET.get(PAGE_VAR, 0)) + 1
+        except ValueError:
+            page_number = 1
+        return self.paginator(queryset, per_page, orphans, allow_empty_first_page, page_number=page_number)
+
+    def get_queryset(self, request):
+        """Annotate each question with its vote total and open status."""
+        now = timezone.now()
+        votes = (Choice.objects.filter(question=OuterRef('pk')).order_by()
+                 .values('question').annotate(total=Sum('votes')).values('total'))
+        return super().get_queryset(request).annotate(
+            total_votes=Coalesce(Subquery(votes, output_field=IntegerField()), 0),
+            is_open=ExpressionWrapper(Q(pub_date__lte=now, end_date__gte=now), output_field=BooleanField()),
+        )
+
+    def total_votes(self, obj):
+        """Votes cast on the question."""
+        return obj.total_votes
+
+    def is_open(self, obj):
+        """The question is open for voting."""
+        return obj.is_open
+
+    total_votes.admin_order_field = 'total_votes'
+    total_votes.short_description = 'Votes'
+    is_open.admin_order_field = 'is_open'
+    is_open.boolean = True
+    is_open.short_description = 'Open?'
 
 
 admin.site.register(Question, QuestionAdmin)
@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.urls import Resolver404, resolve
+
+# Route class of POSTs by URL name; every other request is a read.
+ROUTE_CLASSES = {
+    'vote': 'vote',
+    'ballot': 'vote',
+    'login': 'login',
+}
+
+
+def route_class(request):
+    """Return 'vote', 'login' or 'read' for a request."""
+    if request.method != 'POST':
+        return 'read'
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return 'read'
+    return ROUTE_CLASSES.get(match.url_name, 'read')
+
+
+class AdmissionController:
+    """Caps the requests in flight per route class, queueing briefly.
+
+    ``limits`` maps each class to ``(max_in_flight, max_wait_seconds)``
+    and ``capacity`` caps the requests in flight across all classes. A
+    request waits at most ``max_wait_seconds`` for a slot and is shed after
+    that. Classes earlier in ``priority`` get the shared slots first: a
+    later class is held back only while an earlier one has requests waiting
+    that its own cap would let in, so a class queued on its own cap never
+    blocks the others.
+    """
+
+    def __init__(self, limits, priority, capacity=None):
+        self.limits = limits
+        self.priority = priority
+        self.capacity = capacity if capacity is not None else sum(limit for limit, _ in limits.values())
+        self.in_flight = Counter()
+        self.waiting = Counter()
+        self.admitted = Counter()
+        self.shed = Counter()
+        self._condition = threading.Condition()
+
+    def _capped(self, kind):
+        return self.in_flight[kind] >= self.limits[kind][0]
+
+    def _blocked(self, kind):
+        if self._capped(kind) or sum(self.in_flight.values()) >= self.capacity:
+            return True
+        return any(self.waiting[other] and not self._capped(other)
+                   for other in self.priority[:self.priority.index(kind)])
+
+    def admit(self, kind):
+        """Wait for a slot for ``kind``; return False if the request is shed."""
+        deadline = time.monotonic() + self.limits[kind][1]
+        with self._condition:
+            self.waiting[kind] += 1
+            try:
+                while self._blocked(kind):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.shed[kind] += 1
+                        return False
+                    self._condition.wait(remaining)
+                self.in_flight[kind] += 1
+                self.admitted[kind] += 1
+                return True
+            finally:
+                self.waiting[kind] -= 1
+                self._condition.notify_all()
+
+    def release(self, kind):
+        """Give back a slot taken by admit()."""
+        with self._condition:
+            self.in_flight[kind] -= 1
+            self._condition.notify_all()
+
+    def stats(self):
+        """Return the current counters per route class."""
+        with self._condition:
+            return {
+                kind: {
+                    'in_flight': self.in_flight[kind],
+                    'waiting': self.waiting[kind],
+                    'admitted': self.admitted[kind],
+                    'shed': self.shed[kind],
+                }
+                for kind in self.priority
+            }
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_controller():
+    """Return the process-wide controller, or None when admission control is off."""
+    global _controller
+    if not settings.POLLS_ADMISSION:
+        return None
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = AdmissionController(settings.POLLS_ADMISSION, settings.POLLS_ADMISSION_PRIORITY,
+                                                  settings.POLLS_ADMISSION_CAPACITY)
+    return _controller
+
+
+@receiver(setting_changed)
+def reset_controller(setting, **kwargs):
+    """Start from fresh counters when the limits are overridden."""
+    global _controller
+    if setting.startswith('POLLS_ADMISSION'):
+        _controller = None
@@ -0,0 +1,98 @@
+from itertools import chain
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+from django.contrib.auth.models import User
+
+from .archive import read_archive
+from .models import Choice, Question, Vote
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def require_numpy():
+    """Raise ImproperlyConfigured when NumPy is not installed."""
+    if np is None:
+        raise ImproperlyConfigured("Poll analytics require NumPy (pip install numpy).")
+
+
+def load_votes(question_ids=None, using=DEFAULT_DB_ALIAS):
+    """Load votes as an ``(n, 3)`` int64 array of (user, question, choice) ids.
+
+    Rows are streamed from the database straight into the array, without
+    building a model instance or tuple list per vote. The votes of archived
+    questions are read from their archive files.
+    """
+    require_numpy()
+    votes = Vote.objects.using(using).filter(user__isnull=False)
+    archived = Question.objects.using(using).filter(archived=True)
+    if question_ids is not None:
+        votes = votes.filter(question_id__in=question_ids)
+        archived = archived.filter(pk__in=question_ids)
+    rows = votes.values_list('user_id', 'question_id', 'selected_choice_id').iterator(chunk_size=10000)
+    parts = [np.fromiter(chain.from_iterable(rows), dtype=np.int64).reshape(-1, 3)]
+    for question_id in archived.values_list('pk', flat=True):
+        rows = ((user_id, question_id, choice_id)
+                for user_id, choice_id in read_archive(question_id) if user_id is not None)
+        parts.append(np.fromiter(chain.from_iterable(rows), dtype=np.int64).reshape(-1, 3))
+    return np.concatenate(parts)
+
+
+def crosstab(votes, first_id, second_id, first_choices, second_choices):
+    """Count how the users who answered both questions combined their answers.
+
+    Return a ``len(first_choices) x len(second_choices)`` array whose cell
+    ``[i, j]`` is the number of users who picked ``first_choices[i]`` and
+    ``second_choices[j]``.
+    """
+    first = votes[votes[:, 1] == first_id]
+    second = votes[votes[:, 1] == second_id]
+    _, in_first, in_second = np.intersect1d(first[:, 0], second[:, 0], return_indices=True)
+    rows = np.searchsorted(first_choices, first[in_first, 2])
+    cols = np.searchsorted(second_choices, second[in_second, 2])
+    cells = np.bincount(rows * len(second_choices) + cols, minlength=len(first_choices) * len(second_choices))
+    return cells.reshape(len(first_choices), len(second_choices))
+
+
+def participation(votes, total_users):
+    """Return ``{question_id: share of users who voted}``."""
+    if not total_users:
+        return {}
+    questions, counts = np.unique(votes[:, 1], return_counts=True)
+    return {int(question): count / total_users for question, count in zip(questions, counts)}
+
+
+def cramers_v(table):
+    """Cramér's V of a contingency table: 0 for independent answers, 1 for fully tied."""
+    table = np.asarray(table, dtype=np.float64)
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+    total = table.sum()
+    if total == 0 or min(table.shape) < 2:
+        return 0.0
+    expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / total
+    chi2 = ((table - expected) ** 2 / expected).sum()
+    return float(np.sqrt(chi2 / (total * (min(table.shape) - 1))))
+
+
+def compare_questions(first, second, using=DEFAULT_DB_ALIAS):
+    """Cross-tabulate two questions and summarise how their answers relate."""
+    require_numpy()
+    votes = load_votes([first.pk, second.pk], using=using)
+    first_choices = list(Choice.objects.using(using).filter(question=first).order_by('pk'))
+    second_choices = list(Choice.objects.using(using).filter(question=second).order_by('pk'))
+    table = crosstab(votes, first.pk, second.pk,
+                     np.array([choice.pk for choice in first_choices], dtype=np.int64),
+                     np.array([choice.pk for choice in second_choices], dtype=np.int64))
+    rates = participation(votes, User.objects.using(using).count())
+    return {
+        'second_choices': second_choices,
+        'rows': [(choice, row.tolist()) for choice, row in zip(first_choices, table)],
+        'table': table,
+        'respondents': int(table.sum()),
+        'first_participation': rates.get(first.pk, 0.0),
+        'second_participation': rates.get(second.pk, 0.0),
+        'cramers_v': cramers_v(table),
+    }
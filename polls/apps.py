@@ -1,7 +1,31 @@
 from django.apps import AppConfig
+from django.db import connections, router
+from django.db.models.signals import post_migrate
+
+# Indexes Django's model state cannot describe. SQLite rebuilds a table
+# whenever a migration alters it and drops these along the way, so they are
+# (re)created after every migrate.
+SQLITE_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS "polls_question_text_nocase" ON "polls_question" ("question_text" COLLATE NOCASE);',
+]
+
+
+def create_sqlite_indexes(sender, using, **kwargs):
+    """Create the raw SQLite indexes on a migrated database."""
+    Question = sender.get_model('Question')
+    if connections[using].vendor != 'sqlite' or not router.allow_migrate_model(using, Question):
+        return
+    with connections[using].cursor() as cursor:
+        for sql in SQLITE_INDEXES:
+            cursor.execute(sql)
 
 
 class PollsConfig(AppConfig):
     """Application configuration."""
 
     name = 'polls'
+
+    def ready(self):
+        """Connect the post-migrate index hook and the signal receivers."""
+        post_migrate.connect(create_sqlite_indexes, sender=self)
+        from . import receivers, search, trending, voted  # noqa: F401
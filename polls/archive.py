@@ -0,0 +1,103 @@
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Question, Vote
+
+MAGIC = b'KUPV1\n'
+
+
+def archive_path(question_id):
+    """Return the archive file of a question's votes."""
+    return os.path.join(settings.POLLS_ARCHIVE_DIR, f'question-{question_id}.votes')
+
+
+def _pack(rows):
+    """Pack ``(user_id, choice_id)`` rows as two zlib-compressed columns.
+
+    Rows are sorted by choice then user, so the choice column is long runs
+    of the same id and the user column mostly ascending; both compress
+    far better than the row-wise table.
+    """
+    rows = sorted(rows, key=lambda row: (row[1], row[0]))
+    users = array('q', (user_id or 0 for user_id, _ in rows))
+    choices = array('q', (choice_id for _, choice_id in rows))
+    if sys.byteorder == 'big':
+        users.byteswap()
+        choices.byteswap()
+    return MAGIC + zlib.compress(struct.pack('<q', len(rows)) + users.tobytes() + choices.tobytes(), 9)
+
+
+def _unpack(data):
+    """Return the ``(user_id, choice_id)`` rows of a packed archive."""
+    if not data.startswith(MAGIC):
+        raise ValueError("Not a vote archive.")
+    payload = zlib.decompress(data[len(MAGIC):])
+    count, = struct.unpack_from('<q', payload)
+    users, choices = array('q'), array('q')
+    users.frombytes(payload[8:8 + 8 * count])
+    choices.frombytes(payload[8 + 8 * count:])
+    if sys.byteorder == 'big':
+        users.byteswap()
+        choices.byteswap()
+    return [(user_id or None, choice_id) for user_id, choice_id in zip(users, choices)]
+
+
+def read_archive(question_id):
+    """Return the archived ``(user_id, choice_id)`` rows of a question."""
+    try:
+        with open(archive_path(question_id), 'rb') as archive:
+            return _unpack(archive.read())
+    except FileNotFoundError:
+        return []
+
+
+def archived_tallies(question_id):
+    """Return ``{choice_id: votes}`` counted from a question's archive."""
+    return Counter(choice_id for _, choice_id in read_archive(question_id))
+
+
+def archive_question(question):
+    """Move a closed question's votes from the Vote table to its archive file.
+
+    ``Choice.votes`` is left alone, so the final tallies stay queryable.
+    Return the number of votes archived.
+    """
+    if question.can_vote():
+        raise ValueError(f"Question {question.pk} is still open.")
+    os.makedirs(settings.POLLS_ARCHIVE_DIR, exist_ok=True)
+    path = archive_path(question.pk)
+    with transaction.atomic():
+        archived = Question.objects.select_for_update().values_list('archived', flat=True).get(pk=question.pk)
+        votes = Vote.objects.filter(question=question)
+        rows = list(votes.values_list('user_id', 'selected_choice_id'))
+        # A file left by a run whose transaction failed holds rows that are
+        # still in Vote; only a committed archive is merged.
+        previous = read_archive(question.pk) if archived else []
+        with open(path + '.partial', 'wb') as archive:
+            archive.write(_pack(previous + rows))
+        os.replace(path + '.partial', path)
+        votes.delete()
+        Question.objects.filter(pk=question.pk).update(archived=True)
+    return len(rows)
+
+
+def restore_question(question):
+    """Move a question's archived votes back into the Vote table."""
+    rows = read_archive(question.pk)
+    with transaction.atomic():
+        Vote.objects.bulk_create(
+            [Vote(question_id=question.pk, user_id=user_id, selected_choice_id=choice_id)
+             for user_id, choice_id in rows],
+            batch_size=500,
+        )
+        Question.objects.filter(pk=question.pk).update(archived=False)
+    if os.path.exists(archive_path(question.pk)):
+        os.remove(archive_path(question.pk))
+    return len(rows)
@@ -0,0 +1,116 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, check_password, identify_hasher, make_password
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+UserModel = get_user_model()
+
+
+class LoginPoolFull(Exception):
+    """The login pool cannot take another password verification."""
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2 hasher whose cost comes from POLLS_PASSWORD_ITERATIONS.
+
+    It keeps the ``pbkdf2_sha256`` algorithm name, so hashes made with the
+    default hasher still verify and are upgraded on the next login.
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'POLLS_PASSWORD_ITERATIONS', PBKDF2PasswordHasher.iterations)
+
+
+class LoginPool:
+    """A fixed number of threads that verify passwords, with a bounded queue.
+
+    At most ``workers + queue_limit`` verifications are admitted at once;
+    anything beyond that fails immediately with LoginPoolFull instead of
+    tying up the worker that serves votes and results.
+    """
+
+    def __init__(self, workers, queue_limit, timeout=None):
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='polls-login')
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+
+    def run(self, fn, *args):
+        """Run ``fn(*args)`` on the pool and wait for its result."""
+        if not self._slots.acquire(blocking=False):
+            raise LoginPoolFull()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda f: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise LoginPoolFull()
+
+    def shutdown(self):
+        """Stop the worker threads once the queued work is done."""
+        self._executor.shutdown(wait=False)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_login_pool():
+    """Return the process-wide login pool, creating it from settings."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = LoginPool(
+                    workers=settings.POLLS_LOGIN_POOL_WORKERS,
+                    queue_limit=settings.POLLS_LOGIN_POOL_QUEUE,
+                    timeout=settings.POLLS_LOGIN_POOL_TIMEOUT,
+                )
+    return _pool
+
+
+@receiver(setting_changed)
+def reset_login_pool(setting, **kwargs):
+    """Rebuild the pool when its settings are overridden."""
+    global _pool
+    if setting.startswith('POLLS_LOGIN_POOL_') and _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+class PooledModelBackend(ModelBackend):
+    """ModelBackend that hashes passwords on the login pool.
+
+    The user lookup and any hash upgrade stay on the request thread; only
+    the CPU-bound hashing is handed to the pool.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        """Authenticate the user, raising LoginPoolFull when overloaded."""
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash anyway so unknown usernames take as long as known ones.
+            get_login_pool().run(make_password, password)
+            return None
+        if not get_login_pool().run(check_password, password, user.password):
+            return None
+        if identify_hasher(user.password).must_update(user.password):
+            user.password = get_login_pool().run(make_password, password)
+            user.save(update_fields=['password'])
+        if self.user_can_authenticate(user):
+            return user
+        return None
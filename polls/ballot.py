@@ -0,0 +1,76 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Choice, Vote
+from .signals import ballot_cast
+from .tallies import get_shared_tally, update_tallies
+
+
+def record_votes(user, choices):
+    """Write ``user``'s votes for the given choices in one transaction.
+
+    Existing votes are fetched with one query, new and changed ones are
+    written with ``bulk_create``/``bulk_update``, and the tallies are moved
+    by one UPDATE per distinct delta instead of recounting every choice, or
+    in the shared tally when that is enabled.
+    Return the list of ``(question_id, old_choice_id, new_choice_id)``
+    changes, which is also sent with the ``ballot_cast`` signal.
+    """
+    with transaction.atomic():
+        existing = {
+            vote.question_id: vote
+            for vote in Vote.objects.select_for_update().filter(
+                user=user, question_id__in=[choice.question_id for choice in choices])
+        }
+        created, updated, changes = [], [], []
+        deltas = Counter()
+        for choice in choices:
+            vote = existing.get(choice.question_id)
+            if vote is None:
+                created.append(Vote(user=user, question_id=choice.question_id, selected_choice=choice))
+                old_choice_id = None
+            elif vote.selected_choice_id != choice.id:
+                old_choice_id = vote.selected_choice_id
+                deltas[old_choice_id] -= 1
+                vote.selected_choice = choice
+                updated.append(vote)
+            else:
+                continue
+            deltas[choice.id] += 1
+            changes.append((choice.question_id, old_choice_id, choice.id))
+        Vote.objects.bulk_create(created)
+        Vote.objects.bulk_update(updated, ['selected_choice'])
+        tally = get_shared_tally()
+        if tally is None:
+            update_tallies(deltas)
+    if tally is not None:
+        # Only touch shared memory once the votes are committed.
+        update_tallies(tally.add(deltas))
+        tally.flush_if_due(settings.POLLS_SHARED_TALLY_FLUSH_SECONDS)
+    if changes:
+        ballot_cast.send(sender=Vote, user=user, changes=changes)
+    return changes
+
+
+def cast_ballot(user, selections):
+    """Vote on many questions at once.
+
+    ``selections`` maps question ids to choice ids. Every selection is
+    checked with one query; the valid ones are recorded together and a
+    ``{question_id: message}`` dict is returned for the rest.
+    """
+    choices = Choice.objects.select_related('question').in_bulk(selections.values())
+    valid, errors = [], {}
+    for question_id, choice_id in selections.items():
+        choice = choices.get(choice_id)
+        if choice is None or choice.question_id != question_id:
+            errors[question_id] = "You didn't select a valid choice."
+        elif not choice.question.can_vote():
+            errors[question_id] = "This poll has been out of date."
+        else:
+            valid.append(choice)
+    if valid:
+        record_votes(user, valid)
+    return errors
@@ -0,0 +1,105 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpResponseRedirect
+
+FIELD = 'idempotency_key'
+
+
+class IdempotencyStore:
+    """Remembers which submissions were seen and where they redirected.
+
+    Entries expire after ``ttl`` seconds and the oldest are evicted past
+    ``max_keys``, so the store stays small however many forms are sent.
+    """
+
+    def __init__(self, ttl, max_keys):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def claim(self, key, url, now=None):
+        """Record ``key`` with its redirect ``url``.
+
+        Return None if the key is new, otherwise the URL recorded by the
+        first submission.
+        """
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            while self._entries:
+                oldest, (expires, _) = next(iter(self._entries.items()))
+                if expires > now and len(self._entries) < self.max_keys:
+                    break
+                del self._entries[oldest]
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry[1]
+            self._entries[key] = (now + self.ttl, url)
+            return None
+
+    def forget(self, key):
+        """Drop ``key`` so the same submission can be retried."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Return the process-wide idempotency store."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = IdempotencyStore(settings.POLLS_IDEMPOTENCY_TTL, settings.POLLS_IDEMPOTENCY_MAX_KEYS)
+    return _store
+
+
+@receiver(setting_changed)
+def reset_store(setting, **kwargs):
+    """Start from an empty store when its settings are overridden."""
+    global _store
+    if setting.startswith('POLLS_IDEMPOTENCY'):
+        _store = None
+
+
+def new_key():
+    """Return a fresh key to embed in a form."""
+    return uuid.uuid4().hex
+
+
+def _request_key(request):
+    key = request.POST.get(FIELD)
+    return (request.user.pk, key) if key else None
+
+
+def replay(request, url):
+    """Claim the request's key for ``url``.
+
+    Return the original redirect when the key was already used, or None
+    when this is the first submission and the view should handle it.
+    """
+    key = _request_key(request)
+    if key is None:
+        return None
+    seen = get_store().claim(key, url)
+    return HttpResponseRedirect(seen) if seen is not None else None
+
+
+def release(request):
+    """Let a submission that was not recorded be sent again."""
+    key = _request_key(request)
+    if key is not None:
+        get_store().forget(key)
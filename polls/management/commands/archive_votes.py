@@ -0,0 +1,33 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from polls.archive import archive_question, restore_question
+from polls.models import Question
+
+
+class Command(BaseCommand):
+    """Move the votes of long-closed polls into compressed archive files."""
+
+    help = "Move the votes of long-closed polls into compressed archive files."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.POLLS_ARCHIVE_AFTER_DAYS,
+                            help="Archive polls closed more than DAYS days ago.")
+        parser.add_argument('--restore', type=int, nargs='+', metavar='QUESTION_ID',
+                            help="Move these questions' archived votes back into the database.")
+
+    def handle(self, *args, **options):
+        if options['restore']:
+            for question_id in options['restore']:
+                try:
+                    question = Question.objects.get(pk=question_id, archived=True)
+                except Question.DoesNotExist:
+                    raise CommandError(f"Question {question_id} is not archived.")
+                self.stdout.write(f"Restored {restore_question(question)} votes of question {question_id}.")
+            return
+        cutoff = timezone.now() - datetime.timedelta(days=options['days'])
+        for question in Question.objects.filter(end_date__lt=cutoff, archived=False):
+            self.stdout.write(f"Archived {archive_question(question)} votes of question {question.pk}.")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from polls.tallies import get_shared_tally
+
+
+class Command(BaseCommand):
+    """Write the shared memory tallies back to the database."""
+
+    help = "Write the shared memory tallies back to Choice.votes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recount', action='store_true',
+                            help="Recount Choice.votes from the votes and reload the shared tallies.")
+
+    def handle(self, *args, **options):
+        tally = get_shared_tally()
+        if tally is None:
+            raise CommandError("The shared tally is not enabled (set POLLS_SHARED_TALLY).")
+        if options['recount']:
+            self.stdout.write(f"Recounted {tally.recount()} choices.")
+        else:
+            self.stdout.write(f"Flushed {tally.flush()} tallies.")
@@ -0,0 +1,36 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from polls.analytics import compare_questions
+from polls.models import Question
+
+
+class Command(BaseCommand):
+    """Print how the answers to two polls relate."""
+
+    help = "Print the cross-tabulation, participation and Cramér's V of two polls."
+
+    def add_arguments(self, parser):
+        parser.add_argument('first', type=int, help="Question id of the rows.")
+        parser.add_argument('second', type=int, help="Question id of the columns.")
+
+    def handle(self, *args, **options):
+        try:
+            first = Question.objects.get(pk=options['first'])
+            second = Question.objects.get(pk=options['second'])
+        except Question.DoesNotExist as exc:
+            raise CommandError(exc)
+        try:
+            result = compare_questions(first, second)
+        except ImproperlyConfigured as exc:
+            raise CommandError(exc)
+        self.stdout.write(f"{first} x {second}")
+        width = max([len(str(choice)) for choice, _ in result['rows']] + [0])
+        self.stdout.write(' ' * width + ''.join(f" | {choice}" for choice in result['second_choices']))
+        for choice, counts in result['rows']:
+            cells = ''.join(f" | {count:>{len(str(column))}}"
+                            for count, column in zip(counts, result['second_choices']))
+            self.stdout.write(f"{str(choice):<{width}}{cells}")
+        self.stdout.write(f"Respondents to both: {result['respondents']}")
+        self.stdout.write(f"Participation: {result['first_participation']:.1%} / {result['second_participation']:.1%}")
+        self.stdout.write(f"Cramér's V: {result['cramers_v']:.3f}")
@@ -0,0 +1,52 @@
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from polls.profiling import Profile, profile_token
+
+
+class Command(BaseCommand):
+    """Replay a URL through the test client and print where the time went."""
+
+    help = "Replay a URL N times and print the hottest functions and SQL statements."
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', nargs='?', help="Path to request, e.g. /polls/1/.")
+        parser.add_argument('--repeat', type=int, default=10, help="Number of requests to make.")
+        parser.add_argument('--method', choices=['get', 'post'], default='get')
+        parser.add_argument('--data', nargs='*', default=[], metavar='KEY=VALUE', help="Form data to send.")
+        parser.add_argument('--user', help="Log in as this username first.")
+        parser.add_argument('--limit', type=int, default=20, help="Number of functions and queries to show.")
+        parser.add_argument('--token', action='store_true',
+                            help="Print a signed X-Polls-Profile header value and exit.")
+
+    def handle(self, *args, **options):
+        if options['token']:
+            self.stdout.write(profile_token())
+            return
+        if not options['url']:
+            raise CommandError("Give the URL to profile.")
+        data = dict(item.split('=', 1) for item in options['data'])
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'], POLLS_PROFILE_DIR=None):
+            client = Client()
+            if options['user']:
+                try:
+                    client.force_login(get_user_model().objects.get_by_natural_key(options['user']))
+                except get_user_model().DoesNotExist:
+                    raise CommandError(f"No user named {options['user']}.")
+            request = getattr(client, options['method'])
+            statuses = Counter()
+            with Profile() as profile:
+                for _ in range(options['repeat']):
+                    statuses[request(options['url'], data).status_code] += 1
+        total = sum(seconds for _, _, seconds in profile.queries)
+        self.stdout.write(f"{options['repeat']} requests, status codes: {dict(statuses)}")
+        self.stdout.write(f"{len(profile.queries)} queries, {total * 1000:.1f} ms in SQL")
+        self.stdout.write("\nHottest functions:")
+        self.stdout.write(profile.hottest_functions(options['limit']))
+        self.stdout.write("Hottest queries:")
+        for sql, count, seconds in profile.hottest_queries(options['limit']):
+            self.stdout.write(f"{seconds * 1000:9.2f} ms {count:6d}x  {sql}")
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from polls.search import rebuild_index
+
+
+class Command(BaseCommand):
+    """Rebuild the full-text poll search index."""
+
+    help = "Rebuild the full-text poll search index from the questions and choices."
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Indexed {rebuild_index()} questions.")
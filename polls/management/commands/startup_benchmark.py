@@ -0,0 +1,61 @@
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+
+class Command(BaseCommand):
+    """Time how long a fresh worker takes to become useful."""
+
+    help = ("Start fresh processes and time the first served request and the creation "
+            "of a migrated test database.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help="Path for the first request; defaults to the poll index.")
+        parser.add_argument('--repeat', type=int, default=5, help="Number of fresh processes per measurement.")
+        parser.add_argument('--child', choices=['request', 'test-db'], help="Internal: run one measurement in this process.")
+
+    def handle(self, *args, **options):
+        if options['child'] == 'request':
+            self.first_request(options['url'] or reverse('polls:index'))
+            return
+        if options['child'] == 'test-db':
+            self.migrated_test_db()
+            return
+        if options['repeat'] < 1:
+            raise CommandError("--repeat must be at least 1.")
+        for child, label in [('request', "first request"), ('test-db', "migrated test database")]:
+            command = [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'startup_benchmark', '--child', child]
+            if options['url']:
+                command += ['--url', options['url']]
+            timings = [self.time_process(command) for _ in range(options['repeat'])]
+            self.stdout.write(f"{label}: median {statistics.median(timings):.3f}s, "
+                              f"min {min(timings):.3f}s over {len(timings)} runs")
+
+    def time_process(self, command):
+        """Run ``command`` in a new process and return its wall time in seconds."""
+        start = time.perf_counter()
+        result = subprocess.run(command, capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        if result.returncode:
+            raise CommandError(f"{' '.join(command)} failed:\n{result.stderr}")
+        return elapsed
+
+    def first_request(self, url):
+        """Serve ``url`` once through the full middleware stack."""
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            status = Client().get(url).status_code
+        if status >= 500:
+            raise CommandError(f"{url} answered {status}.")
+
+    def migrated_test_db(self):
+        """Create and destroy the test database, running every migration."""
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        connection.creation.destroy_test_db(old_name, verbosity=0)
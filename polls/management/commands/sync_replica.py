@@ -0,0 +1,48 @@
+import os
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from polls.routers import replica_alias
+
+
+class Command(BaseCommand):
+    """Copy the primary SQLite database over the read replica."""
+
+    help = "Copy the primary SQLite database over the read replica."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0,
+                            help="Keep copying every INTERVAL seconds instead of once.")
+
+    def handle(self, *args, **options):
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError("No read replica is configured (set POLLS_REPLICA_DB).")
+        target = str(settings.DATABASES[alias]['NAME'])
+        while True:
+            started = time.monotonic()
+            self.copy(target)
+            self.stdout.write(f"Replica {target} synced in {time.monotonic() - started:.2f}s.")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def copy(self, target):
+        """Back up the primary into a temporary file and swap it into place.
+
+        Replacing the file is atomic, so readers see either the old or the
+        new copy, never a half-written one.
+        """
+        primary = connections[DEFAULT_DB_ALIAS]
+        primary.ensure_connection()
+        partial = f'{target}.partial'
+        destination = sqlite3.connect(partial)
+        try:
+            primary.connection.backup(destination)
+        finally:
+            destination.close()
+        os.replace(partial, target)
@@ -0,0 +1,151 @@
+import logging
+import mimetypes
+import os
+import random
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse, HttpResponse
+from django.utils._os import safe_join
+
+from .admission import get_controller, route_class
+from .auth import LoginPoolFull
+from .profiling import Profile, valid_token
+from .utils import get_client_ip
+
+log = logging.getLogger("ku-polls")
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+class StaticFilesMiddleware:
+    """Serve collected static files when there is no front proxy.
+
+    Enabled by POLLS_SERVE_STATIC. Files named in the staticfiles manifest
+    carry their content hash, so they are cached for a year as immutable;
+    precompressed ``.br``/``.gz`` copies are sent when the client accepts
+    them.
+    """
+
+    encodings = (('br', '.br'), ('gzip', '.gz'))
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'POLLS_SERVE_STATIC', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.root = str(settings.STATIC_ROOT)
+        self.hashed = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD') and request.path_info.startswith(self.prefix):
+            response = self.serve(request, request.path_info[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        """Return a response for the static file ``name``, or None."""
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+        content_type, _ = mimetypes.guess_type(path)
+        accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        served, encoding = path, None
+        for candidate, suffix in self.encodings:
+            if candidate in accepted and os.path.isfile(path + suffix):
+                served, encoding = path + suffix, candidate
+                break
+        response = FileResponse(open(served, 'rb'), content_type=content_type or 'application/octet-stream')
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Vary'] = 'Accept-Encoding'
+        response['Cache-Control'] = IMMUTABLE if name in self.hashed else 'public, max-age=60'
+        return response
+
+
+class ProfilingMiddleware:
+    """Profile selected requests into POLLS_PROFILE_DIR.
+
+    A request is profiled when it carries an ``X-Polls-Profile`` header
+    made by ``manage.py profile_view --token``, or at random with
+    probability POLLS_PROFILE_SAMPLE_RATE. Each capture is a ``.prof``
+    file for pstats/snakeviz plus the SQL statements with their timings.
+    """
+
+    def __init__(self, get_response):
+        if not settings.POLLS_PROFILE_DIR:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+        with Profile() as profile:
+            response = self.get_response(request)
+        stem = profile.save(settings.POLLS_PROFILE_DIR, f'{request.method} {request.path}', settings.POLLS_PROFILE_KEEP)
+        log.info("Profiled %s %s into %s", request.method, request.path, stem)
+        return response
+
+    def should_profile(self, request):
+        """Decide whether to profile this request."""
+        token = request.META.get('HTTP_X_POLLS_PROFILE')
+        if token:
+            return valid_token(token, settings.POLLS_PROFILE_TOKEN_MAX_AGE)
+        return random.random() < settings.POLLS_PROFILE_SAMPLE_RATE
+
+
+class AdmissionControlMiddleware:
+    """Shed load with 503 + Retry-After once a route class is saturated.
+
+    Requests are classed as vote, login or read and admitted through the
+    limits in POLLS_ADMISSION; ballots are admitted ahead of logins and
+    reads. Shed counts are logged and available from ``polls:admission``.
+    """
+
+    def __init__(self, get_response):
+        if not settings.POLLS_ADMISSION:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        controller = get_controller()
+        if controller is None:
+            return self.get_response(request)
+        kind = route_class(request)
+        if not controller.admit(kind):
+            log.warning("Shed %s request %s, shed so far: %d", kind, request.path, controller.shed[kind])
+            response = HttpResponse("The server is busy, please try again shortly.", status=503)
+            response['Retry-After'] = str(settings.POLLS_ADMISSION_RETRY_AFTER)
+            return response
+        try:
+            return self.get_response(request)
+        finally:
+            controller.release(kind)
+
+
+class LoginPoolFullMiddleware:
+    """Answer 503 + Retry-After when any login finds the login pool full.
+
+    PooledModelBackend raises LoginPoolFull from ``authenticate()``, which
+    every login path calls: the site login, the admin login and any other.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, LoginPoolFull):
+            return None
+        log.warning('Login pool full, IP: %s , Date: %s', get_client_ip(request), str(datetime.now()))
+        response = HttpResponse("Too many logins in progress, please try again shortly.", status=503)
+        response['Retry-After'] = '1'
+        return response
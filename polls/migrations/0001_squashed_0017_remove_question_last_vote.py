@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import polls.models
+
+
+class Migration(migrations.Migration):
+
+    replaces = [
+        ('polls', '0001_initial'),
+        ('polls', '0002_question_end_date'),
+        ('polls', '0003_auto_20200918_1628'),
+        ('polls', '0004_auto_20201030_2027'),
+        ('polls', '0005_auto_20201030_2104'),
+        ('polls', '0006_auto_20201030_2115'),
+        ('polls', '0007_auto_20201030_2242'),
+        ('polls', '0008_auto_20201030_2244'),
+        ('polls', '0009_auto_20201030_2247'),
+        ('polls', '0010_auto_20201030_2250'),
+        ('polls', '0011_auto_20201030_2253'),
+        ('polls', '0012_auto_20201030_2303'),
+        ('polls', '0013_question_text_nocase_index'),
+        ('polls', '0014_question_archived'),
+        ('polls', '0015_search_index'),
+        ('polls', '0016_question_trending'),
+        ('polls', '0017_remove_question_last_vote'),
+    ]
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Question',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_text', models.CharField(max_length=200)),
+                ('pub_date', models.DateTimeField(verbose_name='date published')),
+                ('end_date', models.DateTimeField(default=polls.models.default_end_date, verbose_name='date ended')),
+                ('archived', models.BooleanField(default=False, verbose_name='votes archived')),
+                ('trending', models.FloatField(db_index=True, default=0.0, verbose_name='trending key')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Choice',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('choice_text', models.CharField(max_length=200)),
+                ('votes', models.IntegerField(default=0)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='polls.question')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Vote',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='polls.question')),
+                ('selected_choice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='polls.choice')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS "polls_question_text_nocase" ON "polls_question" ("question_text" COLLATE NOCASE);',
+            'DROP INDEX IF EXISTS "polls_question_text_nocase";',
+        ),
+        migrations.RunSQL(
+            """
+            CREATE VIRTUAL TABLE "polls_search" USING fts5(
+                question_text, choice_text, tokenize = 'unicode61 remove_diacritics 2'
+            );
+            """,
+            'DROP TABLE "polls_search";',
+        ),
+    ]
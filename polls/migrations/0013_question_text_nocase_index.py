@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0012_auto_20201030_2303'),
+    ]
+
+    operations = [
+        # A NOCASE index lets SQLite answer the admin's case-insensitive
+        # prefix search (LIKE 'text%') from the index.
+        # polls.apps recreates it after later migrations rebuild the table.
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS "polls_question_text_nocase" ON "polls_question" ("question_text" COLLATE NOCASE);',
+            'DROP INDEX IF EXISTS "polls_question_text_nocase";',
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0013_question_text_nocase_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='archived',
+            field=models.BooleanField(default=False, verbose_name='votes archived'),
+        ),
+    ]
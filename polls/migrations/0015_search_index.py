@@ -0,0 +1,30 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0014_question_archived'),
+    ]
+
+    operations = [
+        # Full-text index of each question with its choices; the rowid is
+        # the question id. Kept in sync by the receivers in polls.search.
+        migrations.RunSQL(
+            """
+            CREATE VIRTUAL TABLE "polls_search" USING fts5(
+                question_text, choice_text, tokenize = 'unicode61 remove_diacritics 2'
+            );
+            """,
+            'DROP TABLE "polls_search";',
+        ),
+        migrations.RunSQL(
+            """
+            INSERT INTO "polls_search" (rowid, question_text, choice_text)
+            SELECT q.id, q.question_text,
+                   COALESCE((SELECT group_concat(c.choice_text, ' ') FROM "polls_choice" c WHERE c.question_id = q.id), '')
+            FROM "polls_question" q;
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
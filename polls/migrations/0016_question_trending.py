@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0015_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='trending',
+            field=models.FloatField(db_index=True, default=0.0, verbose_name='trending key'),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0016_question_trending'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='question',
+            name='last_vote',
+        ),
+    ]
@@ -5,13 +5,19 @@ from django.utils import timezone
 from django.contrib.auth.models import User
 
 
+def default_end_date():
+    """Close new polls one day after they are created."""
+    return timezone.now() + datetime.timedelta(days=1)
+
+
 class Question(models.Model):
     """The question of the poll."""
 
     question_text = models.CharField(max_length=200)
     pub_date = models.DateTimeField('date published')
-    end_date = models.DateTimeField('date ended', default=timezone.now() + datetime.timedelta(days=1))
-    last_vote = models.CharField(max_length=200, default="")
+    end_date = models.DateTimeField('date ended', default=default_end_date)
+    archived = models.BooleanField('votes archived', default=False)
+    trending = models.FloatField('trending key', default=0.0, db_index=True)
     now = timezone.now()
 
     def __str__(self):
@@ -0,0 +1,90 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.core import signing
+from django.db import connections
+from django.utils.text import slugify
+
+SALT = 'polls.profiling'
+
+
+class Profile:
+    """Collect a cProfile run and every SQL statement executed inside it."""
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.queries = []
+        self._stack = ExitStack()
+
+    def __enter__(self):
+        for alias in connections:
+            self._stack.enter_context(connections[alias].execute_wrapper(self._record))
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.disable()
+        self._stack.close()
+
+    def _record(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((context['connection'].alias, sql, time.perf_counter() - start))
+
+    def hottest_functions(self, limit=20, sort='cumulative'):
+        """Return the pstats report of the ``limit`` costliest functions."""
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def hottest_queries(self, limit=20):
+        """Return ``(sql, count, seconds)`` for the costliest statements, by total time."""
+        totals = defaultdict(lambda: [0, 0.0])
+        for _, sql, seconds in self.queries:
+            totals[sql][0] += 1
+            totals[sql][1] += seconds
+        ranked = sorted(totals.items(), key=lambda item: item[1][1], reverse=True)
+        return [(sql, count, seconds) for sql, (count, seconds) in ranked[:limit]]
+
+    def save(self, directory, label, keep):
+        """Write ``<stamp>-<label>.prof`` and ``.sql.json`` files, keeping the newest ``keep`` captures."""
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10**9:09d}-{slugify(label)}")
+        self.profiler.dump_stats(stem + '.prof')
+        with open(stem + '.sql.json', 'w') as out:
+            json.dump([{'alias': alias, 'sql': sql, 'seconds': seconds} for alias, sql, seconds in self.queries],
+                      out, indent=1)
+        rotate(directory, keep)
+        return stem
+
+
+def rotate(directory, keep):
+    """Delete all but the newest ``keep`` captures in ``directory``."""
+    stems = sorted({name[:-len('.prof')] for name in os.listdir(directory) if name.endswith('.prof')})
+    for stem in stems[:-keep] if keep else stems:
+        for suffix in ('.prof', '.sql.json'):
+            try:
+                os.remove(os.path.join(directory, stem + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def profile_token():
+    """Return a signed value for the X-Polls-Profile request header."""
+    return signing.dumps('profile', salt=SALT)
+
+
+def valid_token(token, max_age):
+    """Return True if ``token`` was made by profile_token() within ``max_age`` seconds."""
+    try:
+        return signing.loads(token, salt=SALT, max_age=max_age) == 'profile'
+    except signing.BadSignature:
+        return False
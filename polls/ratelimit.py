@@ -0,0 +1,113 @@
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpResponse
+
+from .utils import get_client_ip
+
+log = logging.getLogger("ku-polls")
+
+
+class TokenBucketLimiter:
+    """Token buckets keyed by client, refilled continuously.
+
+    Each key may spend ``rate`` requests at once and regains them evenly over
+    ``per`` seconds, so the limit applies to any sliding window of that
+    length. Buckets are plain ``(tokens, timestamp)`` tuples in an LRU
+    ordered dict capped at ``max_keys``; full buckets are dropped since
+    they behave exactly like a missing one.
+    """
+
+    def __init__(self, rate, per, max_keys=10000):
+        self.capacity = float(rate)
+        self.refill = rate / per
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, now=None):
+        """Spend a token for ``key``.
+
+        Return 0 when the request is allowed, otherwise the number of
+        seconds until the next token is available.
+        """
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            tokens, stamp = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - stamp) * self.refill)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                return (1 - tokens) / self.refill
+            tokens -= 1
+            if tokens < self.capacity:
+                self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return 0
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(scope):
+    """Return the limiter for ``scope`` as configured in POLLS_RATE_LIMITS."""
+    limiter = _limiters.get(scope)
+    if limiter is None:
+        rate, per = settings.POLLS_RATE_LIMITS[scope]
+        with _limiters_lock:
+            limiter = _limiters.setdefault(
+                scope, TokenBucketLimiter(rate, per, settings.POLLS_RATE_LIMIT_MAX_KEYS))
+    return limiter
+
+
+@receiver(setting_changed)
+def reset_limiters(setting, **kwargs):
+    """Forget every bucket when the limits are overridden."""
+    if setting.startswith('POLLS_RATE_LIMIT'):
+        _limiters.clear()
+
+
+def too_many_requests(retry_after):
+    """Build the 429 response for a throttled client."""
+    response = HttpResponse("Too many requests, please slow down.", status=429)
+    response['Retry-After'] = str(math.ceil(retry_after))
+    return response
+
+
+def ratelimit(scope, methods=None, field=None):
+    """Throttle a view per client IP and per logged-in user.
+
+    The IP bucket is checked first, before the session or any model is
+    touched. ``methods`` restricts throttling to those HTTP methods.
+    ``field`` names a POST field, such as the username of a login, that
+    gets its own bucket too, so rotating IPs does not reset the limit.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped_view(request, *args, **kwargs):
+            if methods is None or request.method in methods:
+                limiter = get_limiter(scope)
+                ip = get_client_ip(request)
+                retry_after = limiter.hit(f'ip:{ip}')
+                if not retry_after and request.user.is_authenticated:
+                    retry_after = limiter.hit(f'user:{request.user.pk}')
+                if not retry_after and field is not None and request.method == 'POST':
+                    retry_after = limiter.hit(f'{field}:{request.POST.get(field, "")}')
+                if retry_after:
+                    log.warning('Rate limited %s, IP: %s', scope, ip)
+                    return too_many_requests(retry_after)
+            return view_func(request, *args, **kwargs)
+        return wrapped_view
+    return decorator
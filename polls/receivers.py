@@ -0,0 +1,27 @@
+import logging
+from datetime import datetime
+
+from django.contrib.auth.signals import user_logged_in, user_logged_out, user_login_failed
+from django.dispatch import receiver
+
+from .utils import get_client_ip
+
+log = logging.getLogger("ku-polls")
+
+
+@receiver(user_logged_in)
+def log_user_logged_in(sender, request, user, **kwargs):
+    """Logging after user login."""
+    log.info(f'Login user: {user} , IP: {get_client_ip(request)} , Date: {datetime.now()}')
+
+
+@receiver(user_logged_out)
+def log_user_logged_out(sender, request, user, **kwargs):
+    """Logging after user logout."""
+    log.info(f'Logout user: {user} , IP: {get_client_ip(request)} , Date: {datetime.now()}')
+
+
+@receiver(user_login_failed)
+def log_user_login_failed(sender, request, credentials, **kwargs):
+    """Logging when user fail to login."""
+    log.warning('Login user(failed): %s , IP: %s , Date: %s', credentials['username'], get_client_ip(request), str(datetime.now()))
@@ -0,0 +1,60 @@
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_SESSION_KEY = 'polls_pin_primary_until'
+
+
+class ReplicaRouter:
+    """Send writes to the primary and let views choose where reads go.
+
+    Views that can tolerate slightly stale data pick a database with
+    replica_for(); related lookups follow the object they start from, so
+    ``question.choice_set`` reads from wherever ``question`` came from.
+    """
+
+    def db_for_read(self, model, **hints):
+        """Read from the database the related instance was loaded from."""
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        """Always write to the primary."""
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """The replica is a copy of the primary, so any relation is fine."""
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Only migrate the primary; the replica is copied from it."""
+        return db == DEFAULT_DB_ALIAS
+
+
+def replica_alias():
+    """Return the configured replica alias, or None if there is none."""
+    alias = getattr(settings, 'POLLS_READ_REPLICA', None)
+    if alias and alias in settings.DATABASES:
+        return alias
+    return None
+
+
+def replica_for(request):
+    """Return the database alias to read from for this request.
+
+    Users who have just voted stay on the primary for
+    POLLS_REPLICA_PIN_SECONDS so they see their own ballot.
+    """
+    alias = replica_alias()
+    if alias is None or request.session.get(PIN_SESSION_KEY, 0) > time.time():
+        return DEFAULT_DB_ALIAS
+    return alias
+
+
+def pin_primary(request):
+    """Keep this user's reads on the primary for a while after a write."""
+    if replica_alias() is not None:
+        request.session[PIN_SESSION_KEY] = time.time() + settings.POLLS_REPLICA_PIN_SECONDS
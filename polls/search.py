@@ -0,0 +1,107 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Choice, Question
+
+INDEX_SQL = """
+    INSERT INTO polls_search (rowid, question_text, choice_text)
+    SELECT q.id, q.question_text,
+           COALESCE((SELECT group_concat(c.choice_text, ' ') FROM polls_choice c WHERE c.question_id = q.id), '')
+    FROM polls_question q
+"""
+
+
+def index_question(question_id, using=DEFAULT_DB_ALIAS):
+    """Refresh the search row of one question, removing it if the question is gone."""
+    with connections[using].cursor() as cursor:
+        cursor.execute('DELETE FROM polls_search WHERE rowid = %s', [question_id])
+        cursor.execute(INDEX_SQL + ' WHERE q.id = %s', [question_id])
+
+
+def rebuild_index(using=DEFAULT_DB_ALIAS):
+    """Rebuild the whole search index from the question and choice tables."""
+    with connections[using].cursor() as cursor:
+        cursor.execute('DELETE FROM polls_search')
+        cursor.execute(INDEX_SQL)
+        cursor.execute("INSERT INTO polls_search (polls_search) VALUES ('optimize')")
+        cursor.execute('SELECT count(*) FROM polls_search')
+        return cursor.fetchone()[0]
+
+
+def match_expression(text):
+    """Turn free text into an FTS5 query: every word, as a prefix, must match."""
+    words = re.findall(r'\w+', text)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+class SearchResults:
+    """Published questions matching a query, best match first.
+
+    Supports ``count()`` and slicing, so it can be handed to a Paginator;
+    each page is one ranked FTS5 query plus one ``in_bulk`` lookup.
+    Question text matches weigh twice as much as choice text.
+    """
+
+    FROM = """
+        FROM polls_search JOIN polls_question ON polls_question.id = polls_search.rowid
+        WHERE polls_search MATCH %s AND polls_question.pub_date <= %s
+    """
+
+    def __init__(self, text, using=DEFAULT_DB_ALIAS):
+        self.match = match_expression(text)
+        self.using = using
+        connection = connections[using]
+        self.now = connection.ops.adapt_datetimefield_value(timezone.now())
+
+    def count(self):
+        """Return the number of matching questions."""
+        if not self.match:
+            return 0
+        with connections[self.using].cursor() as cursor:
+            cursor.execute('SELECT count(*)' + self.FROM, [self.match, self.now])
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        if not self.match or stop is not None and stop <= start:
+            return []
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                'SELECT polls_search.rowid' + self.FROM + 'ORDER BY bm25(polls_search, 2.0, 1.0) LIMIT %s OFFSET %s',
+                [self.match, self.now, -1 if stop is None else stop - start, start],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        questions = Question.objects.using(self.using).in_bulk(ids)
+        return [questions[pk] for pk in ids if pk in questions]
+
+
+@receiver(post_save, sender=Question)
+def index_saved_question(sender, instance, update_fields=None, raw=False, using=DEFAULT_DB_ALIAS, **kwargs):
+    """Reindex a question when its text changes."""
+    if raw or update_fields is not None and 'question_text' not in update_fields:
+        return
+    index_question(instance.pk, using)
+
+
+@receiver(post_delete, sender=Question)
+def unindex_question(sender, instance, using=DEFAULT_DB_ALIAS, **kwargs):
+    """Remove a deleted question from the index."""
+    index_question(instance.pk, using)
+
+
+@receiver(post_save, sender=Choice)
+@receiver(post_delete, sender=Choice)
+def index_choice_question(sender, instance, raw=False, using=DEFAULT_DB_ALIAS, update_fields=None, **kwargs):
+    """Reindex a question when one of its choices changes."""
+    if raw or update_fields is not None and 'choice_text' not in update_fields:
+        return
+    index_question(instance.question_id, using)
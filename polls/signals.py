@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent once a user's votes have been written. ``changes`` is a list of
+# ``(question_id, old_choice_id, new_choice_id)`` tuples; ``old_choice_id``
+# is None for a first vote on that question.
+ballot_cast = Signal()
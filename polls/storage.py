@@ -0,0 +1,46 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Content-hashed static files, with gzip and brotli copies.
+
+    ``collectstatic`` writes ``name.<hash>.ext`` plus ``.gz`` and, when the
+    brotli package is installed, ``.br`` files next to each text asset so
+    they can be served precompressed.
+    """
+
+    compress_extensions = ('.css', '.js', '.svg', '.html', '.txt', '.json', '.map', '.xml')
+
+    def post_process(self, paths, dry_run=False, **options):
+        """Hash the collected files, then compress the hashed copies."""
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in self.hashed_files.values():
+            if name.endswith(self.compress_extensions):
+                self.compress(name)
+
+    def compress(self, name):
+        """Write the compressed variants of ``name`` that are smaller than it."""
+        with self.open(name) as original:
+            content = original.read()
+        variants = [('.gz', gzip.compress(content, 9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(content)))
+        for suffix, compressed in variants:
+            if len(compressed) < len(content):
+                with open(self.path(name + suffix), 'wb') as target:
+                    target.write(compressed)
+
+    def stored_name(self, name):
+        """Use the plain name until ``collectstatic`` has written a manifest."""
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
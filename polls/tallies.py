@@ -0,0 +1,179 @@
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db.models import Count, F
+from django.dispatch import receiver
+
+from .models import Choice
+
+try:
+    import fcntl
+except ImportError:  # Windows has no flock; the shared tally needs it.
+    fcntl = None
+
+
+class SharedTally:
+    """Vote counts for every choice, kept in a named shared memory block.
+
+    All worker processes on the host attach to the same block. It holds two
+    int64 arrays of ``slots`` entries indexed by choice primary key: the
+    live tally stored as ``votes + 1`` (0 meaning not loaded from the
+    database yet) and the value last written back to ``Choice.votes``.
+    Slot 0 of the live array holds the time of the last flush. Updates
+    take an flock on a lock file so they are atomic across processes.
+    """
+
+    def __init__(self, name, slots, lock_path):
+        size = 2 * slots * 8
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            self._shm = shared_memory.SharedMemory(name=name)
+        # Workers come and go; the block must outlive the one that made it.
+        resource_tracker.unregister(self._shm._name, 'shared_memory')
+        if self._shm.size < size:
+            raise ValueError(f"Shared tally {name} is smaller than {slots} slots.")
+        self.slots = slots
+        self._values = self._shm.buf.cast('q')
+        self._lock_file = open(lock_path, 'a+b')
+        self._thread_lock = threading.Lock()
+
+    @contextmanager
+    def locked(self):
+        """Hold the cross-process lock."""
+        with self._thread_lock:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _load(self, choice_ids):
+        """Fill unloaded slots from the database. Call with the lock held."""
+        missing = [pk for pk in choice_ids if not self._values[pk]]
+        if missing:
+            for pk, votes in Choice.objects.filter(pk__in=missing).values_list('pk', 'votes'):
+                self._values[pk] = votes + 1
+                self._values[self.slots + pk] = votes + 1
+
+    def add(self, deltas):
+        """Apply ``{choice_id: delta}`` and return the deltas that do not fit."""
+        inside = [pk for pk in deltas if 0 < pk < self.slots]
+        with self.locked():
+            self._load(inside)
+            for pk in inside:
+                if self._values[pk]:
+                    self._values[pk] += deltas[pk]
+        return {pk: delta for pk, delta in deltas.items() if pk not in inside}
+
+    def get(self, choice_ids):
+        """Return ``{choice_id: votes}`` for the choices held here."""
+        inside = [pk for pk in choice_ids if 0 < pk < self.slots]
+        if any(not self._values[pk] for pk in inside):
+            with self.locked():
+                self._load(inside)
+        return {pk: self._values[pk] - 1 for pk in inside if self._values[pk]}
+
+    def flush(self):
+        """Write every changed tally back to ``Choice.votes``."""
+        with self.locked():
+            dirty = [pk for pk in range(1, self.slots)
+                     if self._values[pk] and self._values[pk] != self._values[self.slots + pk]]
+            Choice.objects.bulk_update([Choice(pk=pk, votes=self._values[pk] - 1) for pk in dirty], ['votes'])
+            for pk in dirty:
+                self._values[self.slots + pk] = self._values[pk]
+            self._values[0] = int(time.time())
+        return len(dirty)
+
+    def flush_if_due(self, interval):
+        """Flush when the last flush by any process is ``interval`` seconds old."""
+        if time.time() - self._values[0] >= interval:
+            self.flush()
+
+    def _clear(self):
+        """Forget every tally. Call with the lock held."""
+        for i in range(1, 2 * self.slots):
+            self._values[i] = 0
+
+    def clear(self):
+        """Forget every tally so they are reloaded from the database."""
+        with self.locked():
+            self._clear()
+
+    def recount(self):
+        """Recount ``Choice.votes`` of unarchived polls from their votes and reload.
+
+        The lock is held throughout, so no process can flush its old
+        totals over the recount before they are forgotten.
+        """
+        with self.locked():
+            choices = list(Choice.objects.filter(question__archived=False).annotate(count=Count('vote')))
+            for choice in choices:
+                choice.votes = choice.count
+            Choice.objects.bulk_update(choices, ['votes'])
+            self._clear()
+        return len(choices)
+
+    def close(self):
+        """Detach this process from the block."""
+        self._values.release()
+        self._shm.close()
+        self._lock_file.close()
+
+    def unlink(self):
+        """Remove the block from the host."""
+        shared_memory.SharedMemory(name=self._shm.name).unlink()
+
+
+_tally = None
+_tally_lock = threading.Lock()
+
+
+def get_shared_tally():
+    """Return this process's handle on the shared tally, or None if disabled."""
+    global _tally
+    if not settings.POLLS_SHARED_TALLY or fcntl is None:
+        return None
+    if _tally is None:
+        with _tally_lock:
+            if _tally is None:
+                name = settings.POLLS_SHARED_TALLY_NAME
+                _tally = SharedTally(name, settings.POLLS_SHARED_TALLY_SLOTS,
+                                     os.path.join(tempfile.gettempdir(), f'{name}.lock'))
+    return _tally
+
+
+@receiver(setting_changed)
+def reset_shared_tally(setting, **kwargs):
+    """Detach when the shared tally settings are overridden."""
+    global _tally
+    if setting.startswith('POLLS_SHARED_TALLY') and _tally is not None:
+        _tally.close()
+        _tally = None
+
+
+def update_tallies(deltas):
+    """Apply ``{choice_id: delta}`` to ``Choice.votes``, one UPDATE per delta."""
+    by_delta = defaultdict(list)
+    for choice_id, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(choice_id)
+    for delta, choice_ids in by_delta.items():
+        Choice.objects.filter(pk__in=choice_ids).update(votes=F('votes') + delta)
+
+
+def load_votes(choices):
+    """Replace ``choice.votes`` with the live shared tally where there is one."""
+    tally = get_shared_tally()
+    if tally is not None:
+        counts = tally.get([choice.pk for choice in choices])
+        for choice in choices:
+            choice.votes = counts.get(choice.pk, choice.votes)
+    return choices
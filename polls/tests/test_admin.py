@@ -0,0 +1,103 @@
+import datetime
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from polls.admin import QuestionAdmin
+from polls.models import Question
+
+
+def create_question(question_text, days, end_days=1):
+    """Create a question published `days` from now and ending `end_days` from now."""
+    now = timezone.now()
+    return Question.objects.create(question_text=question_text, pub_date=now + datetime.timedelta(days=days),
+                                   end_date=now + datetime.timedelta(days=end_days))
+
+
+class QuestionAdminTests(TestCase):
+    """Test the question changelist and change page."""
+
+    def setUp(self):
+        admin = User.objects.create_superuser("admin", email="admin@example.com", password="abcdef")
+        self.client.force_login(admin)
+
+    def test_changelist_annotates_totals_and_status(self):
+        """Vote totals and open status come from the changelist query."""
+        open_question = create_question("Open question", days=-1)
+        open_question.choice_set.create(choice_text="Yes", votes=3)
+        open_question.choice_set.create(choice_text="No", votes=4)
+        create_question("Closed question", days=-3, end_days=-1)
+        response = self.client.get(reverse('admin:polls_question_changelist'))
+        rows = {question.question_text: question for question in response.context['cl'].result_list}
+        self.assertEqual(rows["Open question"].total_votes, 7)
+        self.assertTrue(rows["Open question"].is_open)
+        self.assertEqual(rows["Closed question"].total_votes, 0)
+        self.assertFalse(rows["Closed question"].is_open)
+
+    def test_changelist_query_count_constant(self):
+        """More questions do not mean more queries."""
+        url = reverse('admin:polls_question_changelist')
+        for i in range(3):
+            create_question(f"Question {i}", days=-1).choice_set.create(choice_text="Yes")
+        self.client.get(url)
+        with self.assertNumQueries(4):
+            self.client.get(url)
+        for i in range(20):
+            create_question(f"More {i}", days=-1).choice_set.create(choice_text="Yes")
+        with self.assertNumQueries(4):
+            self.client.get(url)
+
+    @override_settings(POLLS_ADMIN_COUNT_LIMIT=5)
+    def test_count_is_capped(self):
+        """The paginator stops counting at the configured limit."""
+        for i in range(8):
+            create_question(f"Question {i}", days=-1)
+        with mock.patch.object(QuestionAdmin, 'list_per_page', 2):
+            response = self.client.get(reverse('admin:polls_question_changelist'))
+        self.assertEqual(response.context['cl'].paginator.count, 5)
+
+    @override_settings(POLLS_ADMIN_COUNT_LIMIT=5)
+    def test_pages_past_cap_reachable(self):
+        """Every row can still be reached by paging past the counted limit."""
+        for i in range(8):
+            create_question(f"Question {i}", days=-1)
+        url = reverse('admin:polls_question_changelist')
+        seen = []
+        with mock.patch.object(QuestionAdmin, 'list_per_page', 2):
+            for page in range(4):
+                response = self.client.get(url, {'p': page})
+                self.assertEqual(response.status_code, 200)
+                seen += [question.pk for question in response.context['cl'].result_list]
+        self.assertEqual(len(set(seen)), 8)
+
+    def test_prefix_search(self):
+        """Searching matches the start of the question text, ignoring case."""
+        create_question("What is your favourite colour?", days=-1)
+        create_question("Which colour is best?", days=-1)
+        response = self.client.get(reverse('admin:polls_question_changelist'), {'q': 'what'})
+        self.assertEqual([q.question_text for q in response.context['cl'].result_list],
+                         ["What is your favourite colour?"])
+
+    def test_search_uses_nocase_index(self):
+        """The prefix search can be answered from the NOCASE index."""
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN SELECT id FROM polls_question WHERE question_text LIKE %s ESCAPE '\\'",
+                           ['what%'])
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        self.assertIn('polls_question_text_nocase', plan)
+
+    def test_choice_inline_paginated(self):
+        """The change page only loads one page of choices."""
+        question = create_question("Big poll", days=-1)
+        for i in range(120):
+            question.choice_set.create(choice_text=f"Choice {i}")
+        url = reverse('admin:polls_question_change', args=(question.id,))
+        formset = self.client.get(url).context['inline_admin_formsets'][0].formset
+        self.assertEqual(formset.initial_form_count(), 50)
+        formset = self.client.get(url, {'choice_page': 3}).context['inline_admin_formsets'][0].formset
+        self.assertEqual(formset.initial_form_count(), 20)
+        self.assertEqual(formset.page_obj.paginator.num_pages, 3)
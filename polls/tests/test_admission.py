@@ -0,0 +1,86 @@
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from polls.admission import AdmissionController, get_controller, route_class
+
+
+class AdmissionControllerTests(TestCase):
+    """Test the per-class concurrency caps."""
+
+    def test_caps_concurrency_and_sheds(self):
+        """Past the cap, requests wait up to their deadline and are shed."""
+        controller = AdmissionController({'read': (1, 0.05)}, ['read'])
+        self.assertTrue(controller.admit('read'))
+        start = time.monotonic()
+        self.assertFalse(controller.admit('read'))
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        self.assertEqual(controller.stats()['read']['shed'], 1)
+        controller.release('read')
+        self.assertTrue(controller.admit('read'))
+
+    def test_queued_request_admitted_on_release(self):
+        """A waiting request takes the slot as soon as it is released."""
+        controller = AdmissionController({'vote': (1, 5)}, ['vote'])
+        controller.admit('vote')
+        threading.Timer(0.05, controller.release, ['vote']).start()
+        self.assertTrue(controller.admit('vote'))
+
+    def test_ballots_go_before_reads(self):
+        """When the shared capacity is full, a freed slot goes to a queued ballot first."""
+        controller = AdmissionController({'vote': (2, 5), 'read': (10, 0.1)}, ['vote', 'read'], capacity=2)
+        controller.admit('vote')
+        controller.admit('read')
+        waiter = threading.Thread(target=controller.admit, args=['vote'])
+        waiter.start()
+        time.sleep(0.05)
+        controller.release('read')
+        self.assertFalse(controller.admit('read'))
+        waiter.join()
+        self.assertEqual(controller.stats()['vote']['in_flight'], 2)
+
+    def test_ballots_queued_on_own_cap_do_not_block_reads(self):
+        """Ballots waiting for a ballot slot leave the free read slots usable."""
+        controller = AdmissionController({'vote': (1, 5), 'read': (16, 0.1)}, ['vote', 'read'])
+        controller.admit('vote')
+        waiter = threading.Thread(target=controller.admit, args=['vote'])
+        waiter.start()
+        time.sleep(0.05)
+        self.assertTrue(controller.admit('read'))
+        controller.release('vote')
+        waiter.join()
+
+
+class AdmissionMiddlewareTests(TestCase):
+    """Test load shedding through the middleware."""
+
+    def test_route_classes(self):
+        """Ballots, logins and reads are told apart by URL name."""
+        factory = RequestFactory()
+        self.assertEqual(route_class(factory.post(reverse('polls:vote', args=(1,)))), 'vote')
+        self.assertEqual(route_class(factory.post(reverse('polls:ballot'))), 'vote')
+        self.assertEqual(route_class(factory.post(reverse('login'))), 'login')
+        self.assertEqual(route_class(factory.get(reverse('polls:results', args=(1,)))), 'read')
+        self.assertEqual(route_class(factory.get('/nowhere/')), 'read')
+
+    @override_settings(POLLS_ADMISSION={'vote': (1, 0), 'login': (1, 0), 'read': (0, 0)})
+    def test_shed_requests_get_503(self):
+        """A saturated class answers 503 with Retry-After and counts the shed."""
+        response = self.client.get(reverse('polls:index'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(get_controller().stats()['read']['shed'], 1)
+        self.assertEqual(self.client.get(reverse('login')).status_code, 503)
+        self.assertEqual(self.client.post(reverse('login')).status_code, 200)
+
+    def test_metrics_view_is_staff_only(self):
+        """Staff can read the counters of the worker that served them."""
+        url = reverse('polls:admission')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "abcdef"))
+        stats = self.client.get(url).json()
+        self.assertEqual(stats['read']['in_flight'], 1)
+        self.assertIn('shed', stats['vote'])
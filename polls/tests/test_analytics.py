@@ -0,0 +1,93 @@
+import datetime
+import io
+import shutil
+import tempfile
+import unittest
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from polls import analytics
+from polls.archive import archive_question
+from polls.models import Question, Vote
+
+
+def create_question(question_text, *choices):
+    """Create an open question with the given choices."""
+    now = timezone.now()
+    question = Question.objects.create(question_text=question_text, pub_date=now - datetime.timedelta(days=1),
+                                       end_date=now + datetime.timedelta(days=1))
+    for choice_text in choices:
+        question.choice_set.create(choice_text=choice_text)
+    return question
+
+
+@unittest.skipIf(analytics.np is None, "NumPy is not installed")
+class CrossPollAnalyticsTests(TestCase):
+    """Test cross-tabulations between two polls."""
+
+    def setUp(self):
+        self.coffee = create_question("Coffee?", "Yes", "No")
+        self.sleep = create_question("Sleep well?", "Yes", "No", "Sometimes")
+        coffee_yes, coffee_no = self.coffee.choice_set.order_by('pk')
+        sleep_yes, sleep_no, _ = self.sleep.choice_set.order_by('pk')
+        answers = [(coffee_yes, sleep_no), (coffee_yes, sleep_no), (coffee_no, sleep_yes),
+                   (coffee_no, sleep_yes), (coffee_yes, None)]
+        for i, (coffee, sleep) in enumerate(answers):
+            user = User.objects.create_user(f"student{i}", password="abcdef")
+            Vote.objects.create(user=user, question=self.coffee, selected_choice=coffee)
+            if sleep is not None:
+                Vote.objects.create(user=user, question=self.sleep, selected_choice=sleep)
+        User.objects.create_user("absent", password="abcdef")
+
+    def test_crosstab(self):
+        """Only users who answered both polls are counted, in choice order."""
+        result = analytics.compare_questions(self.coffee, self.sleep)
+        self.assertEqual([counts for _, counts in result['rows']], [[0, 2, 0], [2, 0, 0]])
+        self.assertEqual(result['respondents'], 4)
+
+    def test_archived_polls_unchanged(self):
+        """Archiving both polls leaves the cross-tab and participation as they were."""
+        before = analytics.compare_questions(self.coffee, self.sleep)
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        Question.objects.update(end_date=timezone.now() - datetime.timedelta(hours=1))
+        with override_settings(POLLS_ARCHIVE_DIR=directory):
+            for question in Question.objects.all():
+                archive_question(question)
+            self.assertFalse(Vote.objects.exists())
+            after = analytics.compare_questions(self.coffee, self.sleep)
+        self.assertEqual(after['table'].tolist(), before['table'].tolist())
+        self.assertEqual(after['respondents'], 4)
+        self.assertAlmostEqual(after['first_participation'], before['first_participation'])
+        self.assertAlmostEqual(after['second_participation'], before['second_participation'])
+
+    def test_participation(self):
+        """Participation is the share of all users who voted on each poll."""
+        result = analytics.compare_questions(self.coffee, self.sleep)
+        self.assertAlmostEqual(result['first_participation'], 5 / 6)
+        self.assertAlmostEqual(result['second_participation'], 4 / 6)
+
+    def test_cramers_v(self):
+        """Perfectly tied answers score 1, independent answers 0."""
+        self.assertAlmostEqual(analytics.compare_questions(self.coffee, self.sleep)['cramers_v'], 1.0)
+        self.assertAlmostEqual(analytics.cramers_v([[5, 5], [5, 5]]), 0.0)
+
+    def test_command_prints_table(self):
+        """The management command prints the table and statistics."""
+        out = io.StringIO()
+        call_command('poll_crosstab', self.coffee.pk, self.sleep.pk, stdout=out)
+        self.assertIn("Cramér's V: 1.000", out.getvalue())
+        self.assertIn("Respondents to both: 4", out.getvalue())
+
+    def test_view_is_staff_only(self):
+        """Students are sent to the admin login; staff see the table."""
+        url = reverse('polls:analytics', args=(self.coffee.pk, self.sleep.pk))
+        self.client.force_login(User.objects.get(username="student0"))
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "abcdef"))
+        response = self.client.get(url)
+        self.assertContains(response, "Respondents to both: 4")
@@ -0,0 +1,79 @@
+import datetime
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from polls.archive import archive_question, archived_tallies, read_archive, restore_question
+from polls.models import Question, Vote
+
+
+class ArchiveTests(TestCase):
+    """Test moving closed polls' votes to cold storage and back."""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        settings = override_settings(POLLS_ARCHIVE_DIR=directory)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        now = timezone.now()
+        self.question = Question.objects.create(question_text="Old poll", pub_date=now - datetime.timedelta(days=200),
+                                                end_date=now - datetime.timedelta(days=100))
+        self.yes = self.question.choice_set.create(choice_text="Yes", votes=3)
+        self.no = self.question.choice_set.create(choice_text="No", votes=1)
+        for i, choice in enumerate([self.yes, self.yes, self.no, self.yes]):
+            user = User.objects.create_user(f"student{i}", password="abcdef")
+            Vote.objects.create(question=self.question, selected_choice=choice, user=user)
+
+    def test_archive_moves_votes(self):
+        """Archived votes leave the Vote table but keep their tallies."""
+        self.assertEqual(archive_question(self.question), 4)
+        self.assertFalse(Vote.objects.filter(question=self.question).exists())
+        self.question.refresh_from_db()
+        self.assertTrue(self.question.archived)
+        self.assertEqual(archived_tallies(self.question.pk), {self.yes.pk: 3, self.no.pk: 1})
+        self.assertEqual(sorted(self.question.choice_set.values_list('votes', flat=True)), [1, 3])
+
+    def test_restore_brings_votes_back(self):
+        """Restoring recreates exactly the archived votes."""
+        before = sorted(Vote.objects.values_list('user_id', 'selected_choice_id'))
+        archive_question(self.question)
+        self.assertEqual(restore_question(self.question), 4)
+        self.assertEqual(sorted(Vote.objects.values_list('user_id', 'selected_choice_id')), before)
+        self.assertEqual(read_archive(self.question.pk), [])
+
+    def test_failed_archive_not_duplicated(self):
+        """A file left by a rolled-back archive run is overwritten, not appended to."""
+        with mock.patch('django.db.models.query.QuerySet.delete', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                archive_question(self.question)
+        self.assertEqual(Vote.objects.filter(question=self.question).count(), 4)
+        before = sorted(Vote.objects.values_list('user_id', 'selected_choice_id'))
+        self.assertEqual(archive_question(self.question), 4)
+        self.assertEqual(len(read_archive(self.question.pk)), 4)
+        restore_question(self.question)
+        self.assertEqual(sorted(Vote.objects.values_list('user_id', 'selected_choice_id')), before)
+
+    def test_open_polls_not_archived(self):
+        """A poll that can still be voted on is refused."""
+        now = timezone.now()
+        question = Question.objects.create(question_text="Open poll", pub_date=now - datetime.timedelta(days=1),
+                                           end_date=now + datetime.timedelta(days=1))
+        with self.assertRaises(ValueError):
+            archive_question(question)
+
+    def test_command_uses_age_cutoff(self):
+        """The command only archives polls closed longer than --days."""
+        call_command('archive_votes', days=365, stdout=open(os.devnull, 'w'))
+        self.assertEqual(Vote.objects.count(), 4)
+        call_command('archive_votes', days=30, stdout=open(os.devnull, 'w'))
+        self.assertEqual(Vote.objects.count(), 0)
+        call_command('archive_votes', restore=[self.question.pk], stdout=open(os.devnull, 'w'))
+        self.assertEqual(Vote.objects.count(), 4)
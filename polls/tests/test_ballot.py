@@ -0,0 +1,112 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from polls.ballot import cast_ballot, record_votes
+from polls.models import Choice, Question, Vote
+from polls.signals import ballot_cast
+
+
+def create_question(question_text, days, end_days=1):
+    """Create a question published `days` from now and ending `end_days` from now."""
+    now = timezone.now()
+    question = Question.objects.create(question_text=question_text, pub_date=now + datetime.timedelta(days=days),
+                                       end_date=now + datetime.timedelta(days=end_days))
+    question.choice_set.create(choice_text="Yes")
+    question.choice_set.create(choice_text="No")
+    return question
+
+
+class CastBallotTests(TestCase):
+    """Test recording many votes in one ballot."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("Firstykus44", password="abcdef")
+        self.questions = [create_question(f"Survey question {i}", days=-1) for i in range(5)]
+
+    def selections(self, index=0):
+        return {question.id: question.choice_set.all()[index].id for question in self.questions}
+
+    def test_all_votes_recorded(self):
+        """Every selection creates a vote and bumps its tally."""
+        errors = cast_ballot(self.user, self.selections())
+        self.assertEqual(errors, {})
+        self.assertEqual(Vote.objects.filter(user=self.user).count(), 5)
+        self.assertEqual(sorted(Choice.objects.values_list('votes', flat=True)), [0] * 5 + [1] * 5)
+
+    def test_query_count_independent_of_ballot_size(self):
+        """A larger ballot does not issue more queries."""
+        selections = self.selections()
+        with self.assertNumQueries(6):
+            cast_ballot(self.user, selections)
+
+    def test_changed_votes_move_tallies(self):
+        """Changing an answer moves one vote from the old choice to the new one."""
+        cast_ballot(self.user, self.selections(0))
+        cast_ballot(self.user, self.selections(1))
+        self.assertEqual(Vote.objects.filter(user=self.user).count(), 5)
+        for question in self.questions:
+            yes, no = question.choice_set.order_by('id')
+            self.assertEqual((yes.votes, no.votes), (0, 1))
+
+    def test_per_question_errors(self):
+        """Closed polls and foreign choices are reported, the rest are recorded."""
+        closed = create_question("Closed question", days=-3, end_days=-1)
+        selections = self.selections()
+        selections[closed.id] = closed.choice_set.first().id
+        selections[self.questions[0].id] = self.questions[1].choice_set.first().id
+        errors = cast_ballot(self.user, selections)
+        self.assertEqual(set(errors), {closed.id, self.questions[0].id})
+        self.assertEqual(Vote.objects.filter(user=self.user).count(), 4)
+
+    def test_signal_reports_changes(self):
+        """ballot_cast carries the old and new choice of each changed vote."""
+        question = self.questions[0]
+        yes, no = question.choice_set.order_by('id')
+        received = []
+
+        def receiver(changes, **kwargs):
+            received.extend(changes)
+        ballot_cast.connect(receiver)
+        self.addCleanup(ballot_cast.disconnect, receiver)
+        record_votes(self.user, [yes])
+        record_votes(self.user, [yes])
+        record_votes(self.user, [no])
+        self.assertEqual(received, [(question.id, None, yes.id), (question.id, yes.id, no.id)])
+
+
+class BallotViewTests(TestCase):
+    """Test the survey page."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("Firstykus44", password="abcdef")
+        self.client.force_login(self.user)
+        self.question = create_question("Survey question", days=-1)
+
+    def test_lists_open_polls(self):
+        """The survey shows open polls only."""
+        create_question("Closed question", days=-3, end_days=-1)
+        response = self.client.get(reverse('polls:ballot'))
+        self.assertContains(response, "Survey question")
+        self.assertNotContains(response, "Closed question")
+
+    def test_submit_redirects_to_index(self):
+        """A valid ballot is recorded and redirects to the index."""
+        choice = self.question.choice_set.first()
+        response = self.client.post(reverse('polls:ballot'), {f'question_{self.question.id}': choice.id})
+        self.assertRedirects(response, reverse('polls:index'))
+        self.assertTrue(Vote.objects.filter(user=self.user, selected_choice=choice).exists())
+
+    def test_invalid_choice_redisplays_with_error(self):
+        """An invalid answer re-renders the survey with the error next to it."""
+        response = self.client.post(reverse('polls:ballot'), {f'question_{self.question.id}': 0})
+        self.assertContains(response, "You didn&#x27;t select a valid choice.")
+
+    def test_login_required(self):
+        """Anonymous users are sent to the login page."""
+        self.client.logout()
+        response = self.client.get(reverse('polls:ballot'))
+        self.assertEqual(response.status_code, 302)
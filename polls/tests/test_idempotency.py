@@ -0,0 +1,94 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from polls.idempotency import IdempotencyStore
+from polls.models import Question, Vote
+
+
+class IdempotencyStoreTests(TestCase):
+    """Test the expiring key store."""
+
+    def test_first_claim_wins(self):
+        """Later claims of a key get the first claim's URL."""
+        store = IdempotencyStore(ttl=60, max_keys=10)
+        self.assertIsNone(store.claim('a', '/first/', now=0))
+        self.assertEqual(store.claim('a', '/second/', now=1), '/first/')
+
+    def test_keys_expire(self):
+        """A key can be used again once it has expired."""
+        store = IdempotencyStore(ttl=60, max_keys=10)
+        store.claim('a', '/first/', now=0)
+        self.assertIsNone(store.claim('a', '/second/', now=61))
+
+    def test_store_is_bounded(self):
+        """The oldest keys are evicted past max_keys."""
+        store = IdempotencyStore(ttl=60, max_keys=5)
+        for i in range(20):
+            store.claim(i, '/', now=0)
+        self.assertEqual(len(store), 5)
+        self.assertIsNone(store.claim(0, '/', now=0))
+
+
+class IdempotentVoteTests(TestCase):
+    """Test that repeated ballot submissions are only recorded once."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("Firstykus44", password="abcdef")
+        self.client.force_login(self.user)
+        now = timezone.now()
+        self.question = Question.objects.create(question_text="Double click", pub_date=now - datetime.timedelta(days=1),
+                                                end_date=now + datetime.timedelta(days=1))
+        self.yes = self.question.choice_set.create(choice_text="Yes")
+        self.no = self.question.choice_set.create(choice_text="No")
+        self.url = reverse('polls:vote', args=(self.question.id,))
+
+    def test_form_carries_key(self):
+        """Each rendering of the vote form gets a new key."""
+        detail = reverse('polls:detail', args=(self.question.id,))
+        first = self.client.get(detail).context['idempotency_key']
+        second = self.client.get(detail).context['idempotency_key']
+        self.assertNotEqual(first, second)
+        self.assertContains(self.client.get(detail), 'name="idempotency_key"')
+
+    def test_repeat_returns_original_redirect_without_writes(self):
+        """The retry of a ballot redirects like the original and writes nothing."""
+        first = self.client.post(self.url, {'choice': self.yes.id, 'idempotency_key': 'k1'})
+        with self.assertNumQueries(2):
+            repeat = self.client.post(self.url, {'choice': self.no.id, 'idempotency_key': 'k1'})
+        self.assertEqual(repeat['Location'], first['Location'])
+        self.assertEqual(Vote.objects.get(user=self.user).selected_choice, self.yes)
+        self.yes.refresh_from_db()
+        self.assertEqual(self.yes.votes, 1)
+
+    def test_failed_submission_can_be_retried(self):
+        """A submission rejected for a missing choice does not burn its key."""
+        self.client.post(self.url, {'idempotency_key': 'k2'})
+        self.client.post(self.url, {'choice': self.no.id, 'idempotency_key': 'k2'})
+        self.assertEqual(Vote.objects.get(user=self.user).selected_choice, self.no)
+
+    def test_keys_are_per_user(self):
+        """Another user's key does not short-circuit this user's vote."""
+        other = User.objects.create_user("other", password="abcdef")
+        self.client.post(self.url, {'choice': self.yes.id, 'idempotency_key': 'shared'})
+        self.client.force_login(other)
+        self.client.post(self.url, {'choice': self.no.id, 'idempotency_key': 'shared'})
+        self.assertTrue(Vote.objects.filter(user=other, selected_choice=self.no).exists())
+
+    def test_missing_poll_does_not_burn_key(self):
+        """A key sent to a poll that does not exist can still be used."""
+        missing = reverse('polls:vote', args=(self.question.id + 100,))
+        self.assertEqual(self.client.post(missing, {'choice': self.yes.id, 'idempotency_key': 'k3'}).status_code, 404)
+        self.client.post(self.url, {'choice': self.yes.id, 'idempotency_key': 'k3'})
+        self.assertEqual(Vote.objects.get(user=self.user).selected_choice, self.yes)
+
+    def test_repeated_survey_makes_no_queries(self):
+        """A repeated survey submission is answered before the polls are loaded."""
+        data = {f'question_{self.question.id}': self.yes.id, 'idempotency_key': 'k4'}
+        first = self.client.post(reverse('polls:ballot'), data)
+        with self.assertNumQueries(2):
+            repeat = self.client.post(reverse('polls:ballot'), data)
+        self.assertEqual(repeat['Location'], first['Location'])
@@ -0,0 +1,150 @@
+import datetime
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from polls import auth
+from polls.auth import LoginPool, LoginPoolFull
+from polls.models import Question
+
+
+def create_question(question_text, days):
+    """Create a question published the given number of `days` offset to now."""
+    time = timezone.now() + datetime.timedelta(days=days)
+    return Question.objects.create(question_text=question_text, pub_date=time,
+                                   end_date=timezone.now() + datetime.timedelta(days=1))
+
+
+class LoginPoolTests(TestCase):
+    """Test the bounded pool that verifies passwords."""
+
+    def test_run_returns_result(self):
+        """Work submitted to the pool returns its result to the caller."""
+        pool = LoginPool(workers=1, queue_limit=0)
+        self.assertEqual(pool.run(sum, [1, 2, 3]), 6)
+        pool.shutdown()
+
+    def test_full_pool_rejects_immediately(self):
+        """Once workers and queue are busy, new work is refused without waiting."""
+        pool = LoginPool(workers=1, queue_limit=1)
+        release = threading.Event()
+        threads = [threading.Thread(target=pool.run, args=(release.wait,)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        start = time.perf_counter()
+        with self.assertRaises(LoginPoolFull):
+            pool.run(sum, [1])
+        self.assertLess(time.perf_counter() - start, 0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(pool.run(sum, [1]), 1)
+        pool.shutdown()
+
+
+@override_settings(POLLS_PASSWORD_ITERATIONS=100000)
+class LoginBurstTests(TestCase):
+    """Load test: votes keep flowing while a burst of logins saturates the pool."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("Firstykus44", password="abcdef")
+        self.question = create_question("Burst poll", days=-1)
+        self.choice = self.question.choice_set.create(choice_text="Yes")
+        self.pool = LoginPool(workers=1, queue_limit=2)
+        self.stop = threading.Event()
+        self.started = 0
+        self.hashed = 0
+        patcher = mock.patch.object(auth, '_pool', self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.pool.shutdown)
+        self.addCleanup(self.stop.set)
+
+    def start_burst(self, size):
+        """Keep the pool busy with `size` clients verifying real passwords."""
+        burst = [threading.Thread(target=self._login_loop) for _ in range(size)]
+        for thread in burst:
+            thread.start()
+        time.sleep(0.2)
+        return burst
+
+    def _check_password(self, encoded):
+        self.started += 1
+        check_password("abcdef", encoded)
+        self.hashed += 1
+
+    def _login_loop(self):
+        encoded = self.user.password
+        while not self.stop.is_set():
+            try:
+                self.pool.run(self._check_password, encoded)
+            except LoginPoolFull:
+                time.sleep(0.001)
+
+    def end_burst(self, burst):
+        self.stop.set()
+        for thread in burst:
+            thread.join()
+
+    def time_vote(self):
+        start = time.perf_counter()
+        response = self.client.post(reverse('polls:vote', args=(self.question.id,)), {'choice': self.choice.id})
+        self.assertEqual(response.status_code, 302)
+        return time.perf_counter() - start
+
+    def test_login_rejected_with_503_when_pool_full(self):
+        """A login during the burst gets a fast 503 with Retry-After."""
+        burst = self.start_burst(10)
+        response = self.client.post(reverse('login'), {'username': "Firstykus44", 'password': "abcdef"})
+        self.end_burst(burst)
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+
+    def test_vote_latency_stable_during_burst(self):
+        """Vote latency while the pool hashes passwords stays close to the idle latency."""
+        self.client.force_login(self.user)
+        idle = max(self.time_vote() for _ in range(5))
+        burst = self.start_burst(10)
+        finished = self.hashed
+        loaded = max(self.time_vote() for _ in range(5))
+        # Hashes running at some point while the votes were timed.
+        overlapping = self.started - finished
+        self.end_burst(burst)
+        self.assertGreater(overlapping, 0)
+        self.assertLess(loaded, idle * 5 + 0.05)
+
+    def test_admin_login_rejected_with_503_when_pool_full(self):
+        """The admin login, which bypasses PooledLoginView, also answers 503."""
+        User.objects.create_superuser("admin", "admin@example.com", "abcdef")
+        with mock.patch.object(self.pool, 'run', side_effect=LoginPoolFull):
+            response = self.client.post(reverse('admin:login'), {'username': "admin", 'password': "abcdef"})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_login_succeeds_when_pool_idle(self):
+        """Logins still work normally through the pool."""
+        response = self.client.post(reverse('login'), {'username': "Firstykus44", 'password': "abcdef"})
+        self.assertEqual(response.status_code, 302)
+
+    def test_login_keeps_hash_at_configured_cost(self):
+        """A hash made at the configured cost is not rehashed on login."""
+        password = self.user.password
+        self.client.post(reverse('login'), {'username': "Firstykus44", 'password': "abcdef"})
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, password)
+
+    @override_settings(POLLS_PASSWORD_ITERATIONS=1000)
+    def test_login_upgrades_hash_on_pool(self):
+        """A hash at another cost is upgraded, with the new hash made on the pool."""
+        with mock.patch.object(self.pool, 'run', wraps=self.pool.run) as run:
+            self.client.post(reverse('login'), {'username': "Firstykus44", 'password': "abcdef"})
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+        self.assertEqual([call.args[0] for call in run.call_args_list], [check_password, make_password])
@@ -0,0 +1,77 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from polls.models import Question
+from polls.profiling import Profile, profile_token
+
+
+class ProfileTests(TestCase):
+    """Test capturing a profile with its SQL statements."""
+
+    def test_queries_recorded(self):
+        """Statements run inside the profile are collected with timings."""
+        with Profile() as profile:
+            list(Question.objects.all())
+            list(Question.objects.all())
+        sql, count, seconds = profile.hottest_queries()[0]
+        self.assertIn('polls_question', sql)
+        self.assertEqual(count, 2)
+        self.assertGreaterEqual(seconds, 0)
+        self.assertIn('function calls', profile.hottest_functions())
+
+
+class ProfilingMiddlewareTests(TestCase):
+    """Test the opt-in per-request profiling."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def captures(self):
+        return sorted(name for name in os.listdir(self.directory) if name.endswith('.prof'))
+
+    def test_unprofiled_by_default(self):
+        """Requests without a token are not profiled at a zero sample rate."""
+        with override_settings(POLLS_PROFILE_DIR=self.directory, POLLS_PROFILE_SAMPLE_RATE=0):
+            self.client.get(reverse('polls:index'))
+        self.assertEqual(self.captures(), [])
+
+    def test_signed_header_profiles_request(self):
+        """A valid header writes a profile and its SQL log."""
+        with override_settings(POLLS_PROFILE_DIR=self.directory):
+            self.client.get(reverse('polls:index'), HTTP_X_POLLS_PROFILE=profile_token())
+        self.assertEqual(len(self.captures()), 1)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+    def test_forged_header_ignored(self):
+        """A header that is not signed with SECRET_KEY does nothing."""
+        with override_settings(POLLS_PROFILE_DIR=self.directory, POLLS_PROFILE_SAMPLE_RATE=0):
+            self.client.get(reverse('polls:index'), HTTP_X_POLLS_PROFILE='profile')
+        self.assertEqual(self.captures(), [])
+
+    def test_directory_rotates(self):
+        """Only the newest captures are kept."""
+        with override_settings(POLLS_PROFILE_DIR=self.directory, POLLS_PROFILE_SAMPLE_RATE=1, POLLS_PROFILE_KEEP=2):
+            for _ in range(4):
+                self.client.get(reverse('polls:index'))
+        self.assertEqual(len(self.captures()), 2)
+
+
+class ProfileViewCommandTests(TestCase):
+    """Test replaying a URL with manage.py profile_view."""
+
+    def test_prints_hot_functions_and_queries(self):
+        """The report names the view code and its queries."""
+        Question.objects.create(question_text="Profiled", pub_date='2020-01-01T00:00Z')
+        out = io.StringIO()
+        call_command('profile_view', reverse('polls:index'), repeat=3, stdout=out)
+        report = out.getvalue()
+        self.assertIn("3 requests, status codes: {200: 3}", report)
+        self.assertIn("Hottest functions:", report)
+        self.assertIn('FROM "polls_question"', report)
@@ -0,0 +1,95 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from polls.models import Question
+from polls.ratelimit import TokenBucketLimiter
+
+
+class TokenBucketLimiterTests(TestCase):
+    """Test the token bucket store."""
+
+    def test_allows_burst_then_throttles(self):
+        """A client may spend its whole bucket, then must wait for a refill."""
+        limiter = TokenBucketLimiter(rate=3, per=30)
+        self.assertEqual([limiter.hit('a', now=0) for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(limiter.hit('a', now=0), 10)
+        self.assertEqual(limiter.hit('a', now=10), 0)
+
+    def test_clients_are_independent(self):
+        """Throttling one key does not affect another."""
+        limiter = TokenBucketLimiter(rate=1, per=60)
+        limiter.hit('a', now=0)
+        self.assertTrue(limiter.hit('a', now=0))
+        self.assertEqual(limiter.hit('b', now=0), 0)
+
+    def test_store_is_bounded(self):
+        """The least recently seen keys are evicted past max_keys."""
+        limiter = TokenBucketLimiter(rate=5, per=60, max_keys=10)
+        for i in range(100):
+            limiter.hit(i, now=0)
+        self.assertEqual(len(limiter), 10)
+
+    def test_refilled_buckets_are_dropped(self):
+        """A bucket that has refilled completely is not kept in memory."""
+        limiter = TokenBucketLimiter(rate=1, per=1)
+        limiter.hit('a', now=0)
+        limiter.hit('b', now=5)
+        limiter.hit('a', now=10)
+        self.assertEqual(len(limiter), 2)
+        limiter = TokenBucketLimiter(rate=2, per=1)
+        limiter.hit('a', now=0)
+        limiter.hit('a', now=10)
+        self.assertEqual(len(limiter), 1)
+
+
+@override_settings(POLLS_RATE_LIMITS={'vote': (2, 60), 'login': (2, 60)})
+class RateLimitedViewTests(TestCase):
+    """Test that the vote and login endpoints answer 429 when abused."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("Firstykus44", password="abcdef")
+        now = timezone.now()
+        self.question = Question.objects.create(question_text="Limited poll", pub_date=now - datetime.timedelta(days=1),
+                                                end_date=now + datetime.timedelta(days=1))
+        self.choice = self.question.choice_set.create(choice_text="Yes")
+
+    def test_vote_throttled_before_database_work(self):
+        """Votes past the limit are rejected without any queries."""
+        self.client.force_login(self.user)
+        url = reverse('polls:vote', args=(self.question.id,))
+        for _ in range(2):
+            self.assertEqual(self.client.post(url, {'choice': self.choice.id}).status_code, 302)
+        with self.assertNumQueries(0):
+            response = self.client.post(url, {'choice': self.choice.id})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    def test_login_posts_throttled(self):
+        """Repeated login attempts are throttled but the form still loads."""
+        url = reverse('login')
+        for _ in range(2):
+            self.client.post(url, {'username': "Firstykus44", 'password': "wrong"})
+        self.assertEqual(self.client.post(url, {'username': "Firstykus44", 'password': "abcdef"}).status_code, 429)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_forwarded_clients_limited_separately(self):
+        """Clients behind the proxy are told apart by X-Forwarded-For."""
+        User.objects.create_user("Secondykus44", password="abcdef")
+        url = reverse('login')
+        for _ in range(2):
+            self.client.post(url, {'username': "Firstykus44", 'password': "wrong"}, HTTP_X_FORWARDED_FOR='10.0.0.1')
+        response = self.client.post(url, {'username': "Secondykus44", 'password': "wrong"}, HTTP_X_FORWARDED_FOR='10.0.0.2')
+        self.assertEqual(response.status_code, 200)
+
+    def test_login_limited_per_username(self):
+        """Rotating X-Forwarded-For does not reset the limit for a username."""
+        url = reverse('login')
+        for i in range(2):
+            self.client.post(url, {'username': "Firstykus44", 'password': "wrong"}, HTTP_X_FORWARDED_FOR=f'10.0.0.{i}')
+        response = self.client.post(url, {'username': "Firstykus44", 'password': "abcdef"},
+                                    HTTP_X_FORWARDED_FOR='10.0.0.99')
+        self.assertEqual(response.status_code, 429)
@@ -0,0 +1,75 @@
+import datetime
+import os
+import sqlite3
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from polls.models import Question
+from polls.routers import ReplicaRouter, replica_for
+
+
+def with_replica(name=':memory:'):
+    """Settings with a `replica` database alias configured."""
+    databases = dict(settings.DATABASES)
+    databases['replica'] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': name}
+    return override_settings(DATABASES=databases)
+
+
+class ReplicaRoutingTests(TestCase):
+    """Test which database each kind of read goes to."""
+
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+        self.request.session = {}
+
+    def test_no_replica_reads_primary(self):
+        """Without a replica every read goes to the primary."""
+        self.assertEqual(replica_for(self.request), 'default')
+
+    @with_replica()
+    def test_replica_used_when_configured(self):
+        """Index and results reads go to the replica when there is one."""
+        self.assertEqual(replica_for(self.request), 'replica')
+
+    @with_replica()
+    def test_voter_pinned_to_primary(self):
+        """A user who just voted keeps reading from the primary."""
+        user = User.objects.create_user("Firstykus44", password="abcdef")
+        now = timezone.now()
+        question = Question.objects.create(question_text="Pinned", pub_date=now - datetime.timedelta(days=1),
+                                           end_date=now + datetime.timedelta(days=1))
+        choice = question.choice_set.create(choice_text="Yes")
+        self.client.force_login(user)
+        self.client.post(reverse('polls:vote', args=(question.id,)), {'choice': choice.id})
+        self.request.session = self.client.session
+        self.assertEqual(replica_for(self.request), 'default')
+
+    def test_related_reads_follow_instance(self):
+        """Related lookups read from the database their instance came from."""
+        router = ReplicaRouter()
+        question = Question(question_text="Routed")
+        question._state.db = 'replica'
+        self.assertEqual(router.db_for_read(Question, instance=question), 'replica')
+        self.assertEqual(router.db_for_read(Question), 'default')
+        self.assertEqual(router.db_for_write(Question, instance=question), 'default')
+
+
+class SyncReplicaTests(TestCase):
+    """Test copying the primary into the replica file."""
+
+    def test_sync_copies_schema(self):
+        """The replica file gets the primary's tables."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'replica.sqlite3')
+            with with_replica(path):
+                call_command('sync_replica', stdout=open(os.devnull, 'w'))
+            replica = sqlite3.connect(path)
+            tables = {row[0] for row in replica.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            replica.close()
+        self.assertIn('polls_question', tables)
@@ -0,0 +1,104 @@
+import datetime
+import io
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from polls.models import Question
+from polls.search import SearchResults, match_expression
+
+
+def create_question(question_text, days=-1, choices=()):
+    """Create a question published `days` from now with the given choices."""
+    now = timezone.now()
+    question = Question.objects.create(question_text=question_text, pub_date=now + datetime.timedelta(days=days),
+                                       end_date=now + datetime.timedelta(days=30))
+    for choice_text in choices:
+        question.choice_set.create(choice_text=choice_text)
+    return question
+
+
+def search(text):
+    return [question.question_text for question in SearchResults(text)[:]]
+
+
+class SearchIndexTests(TestCase):
+    """Test the FTS5 index and its ranking."""
+
+    def test_question_and_choice_text_found(self):
+        """Both question text and choice text are searchable."""
+        create_question("Favourite lunch?", choices=["Pad thai", "Som tam"])
+        create_question("Best library?")
+        self.assertEqual(search("lunch"), ["Favourite lunch?"])
+        self.assertEqual(search("thai"), ["Favourite lunch?"])
+
+    def test_prefix_and_case_insensitive(self):
+        """Words match as case-insensitive prefixes."""
+        create_question("Kasetsart football team")
+        self.assertEqual(search("FOOT"), ["Kasetsart football team"])
+
+    def test_question_text_ranks_first(self):
+        """A match in the question outranks a match in a choice."""
+        create_question("Which sport?", choices=["Chess club"])
+        create_question("Chess or go?")
+        self.assertEqual(search("chess"), ["Chess or go?", "Which sport?"])
+
+    def test_index_follows_changes(self):
+        """Edits and deletions are reflected immediately."""
+        question = create_question("Old wording")
+        question.question_text = "New wording"
+        question.save()
+        self.assertEqual(search("old"), [])
+        self.assertEqual(search("new"), ["New wording"])
+        choice = question.choice_set.create(choice_text="Banana")
+        self.assertEqual(search("banana"), ["New wording"])
+        choice.delete()
+        self.assertEqual(search("banana"), [])
+        question.delete()
+        self.assertEqual(search("wording"), [])
+
+    def test_unpublished_hidden(self):
+        """Questions published in the future are not returned."""
+        create_question("Secret future poll", days=5)
+        self.assertEqual(search("secret"), [])
+
+    def test_query_syntax_is_escaped(self):
+        """FTS5 operators in user input are treated as words."""
+        create_question("AND OR NOT")
+        self.assertEqual(match_expression('"NOT" (x'), '"NOT"* "x"*')
+        self.assertEqual(search('NOT"'), ["AND OR NOT"])
+        self.assertEqual(search('*'), [])
+
+    def test_rebuild_command(self):
+        """The rebuild command reindexes every question."""
+        create_question("Rebuilt poll", choices=["Yes"])
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM polls_search')
+        self.assertEqual(search("rebuilt"), [])
+        out = io.StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn("Indexed 1 questions.", out.getvalue())
+        self.assertEqual(search("rebuilt"), ["Rebuilt poll"])
+
+
+class SearchViewTests(TestCase):
+    """Test the search page."""
+
+    @override_settings(POLLS_SEARCH_PAGE_SIZE=2)
+    def test_results_paginated(self):
+        """Results are split into pages in rank order."""
+        for i in range(5):
+            create_question(f"Exam question {i}")
+        first = self.client.get(reverse('polls:search'), {'q': 'exam'})
+        self.assertEqual(first.context['page_obj'].paginator.count, 5)
+        self.assertEqual(len(first.context['page_obj'].object_list), 2)
+        last = self.client.get(reverse('polls:search'), {'q': 'exam', 'page': 3})
+        self.assertEqual(len(last.context['page_obj'].object_list), 1)
+
+    def test_no_match_message(self):
+        """An empty result says so."""
+        response = self.client.get(reverse('polls:search'), {'q': 'nothing'})
+        self.assertContains(response, "No polls match your search.")
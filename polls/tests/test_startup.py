@@ -0,0 +1,52 @@
+import io
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.test import TestCase
+
+from polls.models import Question, default_end_date
+
+
+class MigrationHistoryTests(TestCase):
+    """Test the squashed migration history."""
+
+    def test_models_match_migrations(self):
+        """The end_date default no longer makes makemigrations emit a migration."""
+        out = io.StringIO()
+        call_command('makemigrations', 'polls', check=True, dry_run=True, stdout=out)
+        self.assertIn("No changes detected", out.getvalue())
+
+    def test_fresh_database_uses_squashed_migration(self):
+        """A new database replays one polls migration instead of seventeen."""
+        loader = MigrationLoader(connection)
+        nodes = [name for app, name in loader.graph.leaf_nodes() if app == 'polls']
+        self.assertEqual(nodes, ['0001_squashed_0017_remove_question_last_vote'])
+        self.assertEqual(len(loader.get_migration('polls', nodes[0]).replaces), 17)
+
+    def test_end_date_default_is_computed_per_poll(self):
+        """New polls close one day after they are created, not after server start."""
+        field = Question._meta.get_field('end_date')
+        self.assertIs(field.default, default_end_date)
+
+
+class StartupTests(TestCase):
+    """Test what a fresh worker loads and the startup benchmark."""
+
+    def test_views_do_not_import_numpy(self):
+        """Loading the views leaves NumPy for the analytics page."""
+        code = ("import os, sys, django; os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysite.settings'); "
+                "django.setup(); import polls.views; print('numpy' in sys.modules)")
+        result = subprocess.run([sys.executable, '-c', code], cwd=settings.BASE_DIR,
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), 'False')
+
+    def test_benchmark_reports_both_timings(self):
+        """The benchmark times a first request and a migrated test database."""
+        out = io.StringIO()
+        call_command('startup_benchmark', repeat=1, url='/accounts/login/', stdout=out)
+        self.assertIn("first request: median", out.getvalue())
+        self.assertIn("migrated test database: median", out.getvalue())
@@ -0,0 +1,61 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+STATIC_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(STATIC_ROOT=STATIC_ROOT, POLLS_SERVE_STATIC=True)
+class StaticPipelineTests(TestCase):
+    """Test hashed, precompressed static files served by the app."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_templates_link_hashed_names(self):
+        """Pages link to the content-hashed stylesheet."""
+        hashed = staticfiles_storage.url('polls/style.css')
+        self.assertRegex(hashed, r'^/static/polls/style\.[0-9a-f]{12}\.css$')
+        self.assertContains(self.client.get(reverse('polls:index')), hashed)
+
+    def test_precompressed_copies_written(self):
+        """collectstatic leaves a gzip copy next to each hashed text file."""
+        name = staticfiles_storage.stored_name('polls/style.css')
+        with open(os.path.join(STATIC_ROOT, name), 'rb') as original, \
+                open(os.path.join(STATIC_ROOT, name + '.gz'), 'rb') as compressed:
+            self.assertEqual(gzip.decompress(compressed.read()), original.read())
+
+    def test_hashed_file_served_compressed_and_immutable(self):
+        """Hashed files are sent gzipped with a far-future immutable header."""
+        url = staticfiles_storage.url('admin/css/base.css')
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn(b'body', gzip.decompress(b''.join(response.streaming_content)))
+
+    def test_unhashed_file_not_immutable(self):
+        """The plain copy can change, so it is only cached briefly."""
+        response = self.client.get('/static/polls/style.css')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Content-Encoding', response)
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    def test_paths_outside_static_root_not_served(self):
+        """Traversal out of STATIC_ROOT falls through to the URL resolver."""
+        response = self.client.get('/static/../manage.py')
+        self.assertEqual(response.status_code, 404)
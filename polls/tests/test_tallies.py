@@ -0,0 +1,90 @@
+import datetime
+import fcntl
+import io
+import os
+import tempfile
+import uuid
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from polls.ballot import record_votes
+from polls.models import Choice, Question
+from polls.tallies import SharedTally, get_shared_tally
+
+
+class SharedTallyTests(TestCase):
+    """Test vote tallies kept in shared memory."""
+
+    def setUp(self):
+        name = f'ku-polls-test-{uuid.uuid4().hex[:8]}'
+        settings = override_settings(POLLS_SHARED_TALLY=True, POLLS_SHARED_TALLY_NAME=name,
+                                     POLLS_SHARED_TALLY_SLOTS=1024, POLLS_SHARED_TALLY_FLUSH_SECONDS=3600)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.tally = get_shared_tally()
+        self.addCleanup(self.tally.unlink)
+        self.addCleanup(os.remove, os.path.join(tempfile.gettempdir(), f'{name}.lock'))
+        self.tally.flush()
+        now = timezone.now()
+        self.question = Question.objects.create(question_text="Shared", pub_date=now - datetime.timedelta(days=1),
+                                                end_date=now + datetime.timedelta(days=1))
+        self.yes = self.question.choice_set.create(choice_text="Yes", votes=4)
+        self.no = self.question.choice_set.create(choice_text="No")
+        self.user = User.objects.create_user("Firstykus44", password="abcdef")
+
+    def test_votes_counted_in_memory(self):
+        """Votes update the shared tally, not the database row."""
+        record_votes(self.user, [self.yes])
+        self.assertEqual(self.tally.get([self.yes.pk, self.no.pk]), {self.yes.pk: 5, self.no.pk: 0})
+        self.yes.refresh_from_db()
+        self.assertEqual(self.yes.votes, 4)
+
+    def test_other_process_sees_counts(self):
+        """A second attachment to the block reads the same tallies."""
+        record_votes(self.user, [self.yes])
+        record_votes(self.user, [self.no])
+        other = SharedTally(self.tally._shm.name, 1024, self.tally._lock_file.name)
+        self.assertEqual(other.get([self.yes.pk, self.no.pk]), {self.yes.pk: 4, self.no.pk: 1})
+        other.close()
+
+    def test_flush_persists_changes(self):
+        """Flushing writes the changed tallies to Choice.votes."""
+        record_votes(self.user, [self.no])
+        self.assertEqual(self.tally.flush(), 1)
+        self.no.refresh_from_db()
+        self.assertEqual(self.no.votes, 1)
+        self.assertEqual(self.tally.flush(), 0)
+
+    def test_recount_holds_lock(self):
+        """No other process can flush while the recount is written."""
+        record_votes(self.user, [self.yes])
+        other = SharedTally(self.tally._shm.name, 1024, self.tally._lock_file.name)
+        self.addCleanup(other.close)
+        bulk_update = Choice.objects.bulk_update
+
+        def try_lock(*args, **kwargs):
+            with self.assertRaises(BlockingIOError):
+                fcntl.flock(other._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return bulk_update(*args, **kwargs)
+
+        with mock.patch.object(Choice.objects, 'bulk_update', side_effect=try_lock) as patched:
+            call_command('flush_tallies', recount=True, stdout=io.StringIO())
+        self.assertTrue(patched.called)
+        self.assertEqual(other.flush(), 0)
+        self.yes.refresh_from_db()
+        self.assertEqual(self.yes.votes, 1)
+
+    def test_results_read_from_memory(self):
+        """The results page shows the shared tally."""
+        record_votes(self.user, [self.no])
+        response = self.client.get(reverse('polls:results', args=(self.question.id,)))
+        self.assertEqual([choice.votes for choice in response.context['choices']], [4, 1])
+
+    def test_choices_beyond_capacity_use_database(self):
+        """Choices without a slot are handed back to be tallied in the database."""
+        self.assertEqual(self.tally.add({self.yes.pk: 1, 5000: 1}), {5000: 1})
@@ -0,0 +1,106 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from polls.models import Question
+from polls.trending import TrendingCounter, combine, get_counter, score, vote_key
+
+
+def create_question(question_text):
+    """Create an open question with a single choice."""
+    now = timezone.now()
+    question = Question.objects.create(question_text=question_text, pub_date=now - datetime.timedelta(days=1),
+                                       end_date=now + datetime.timedelta(days=1))
+    question.choice_set.create(choice_text="Yes")
+    return question
+
+
+class TrendingKeyTests(TestCase):
+    """Test the log-space decayed counters."""
+
+    def test_votes_add_up(self):
+        """Combining keys adds the votes they stand for."""
+        key = None
+        for _ in range(4):
+            key = combine(key, vote_key(100, 10))
+        self.assertAlmostEqual(score(key, 100, 10), 4)
+
+    def test_score_halves_every_half_life(self):
+        """A vote's weight halves after each half-life."""
+        key = vote_key(0, 10)
+        self.assertAlmostEqual(score(key, 10, 10), 0.5)
+        self.assertAlmostEqual(score(key, 30, 10), 0.125)
+
+    def test_recent_votes_outrank_old_ones(self):
+        """Fewer recent votes beat more votes from several half-lives ago."""
+        old = None
+        for _ in range(5):
+            old = combine(old, vote_key(0, 10))
+        recent = combine(vote_key(40, 10), vote_key(40, 10))
+        self.assertGreater(recent, old)
+
+    def test_large_times_do_not_overflow(self):
+        """Keys stay finite for times far past the half-life."""
+        key = combine(vote_key(2e9, 1), vote_key(2e9, 1))
+        self.assertAlmostEqual(key - 2e9, 1)
+
+
+class TrendingCounterTests(TestCase):
+    """Test folding pending votes into Question.trending."""
+
+    def test_flush_accumulates_in_database(self):
+        """Successive flushes add to the stored key rather than replacing it."""
+        question = create_question("Counted poll")
+        counter = TrendingCounter(half_life=10)
+        now = 1e6
+        counter.record(question.id, now=now)
+        counter.flush()
+        counter.record(question.id, now=now)
+        counter.record(question.id, now=now)
+        self.assertEqual(counter.flush(), 1)
+        question.refresh_from_db()
+        self.assertAlmostEqual(score(question.trending, now, 10), 3)
+
+    def test_flush_issues_one_update_per_question(self):
+        """Many votes on a question cost one UPDATE at flush time."""
+        questions = [create_question(f"Poll {i}") for i in range(3)]
+        counter = TrendingCounter(half_life=10)
+        for question in questions:
+            for _ in range(10):
+                counter.record(question.id, now=100)
+        with self.assertNumQueries(3):
+            counter.flush()
+
+
+@override_settings(POLLS_TRENDING_FLUSH_SECONDS=0)
+class TrendingIndexTests(TestCase):
+    """Test the trending ordering of the index page."""
+
+    def setUp(self):
+        self.questions = [create_question(f"Poll {i}") for i in range(3)]
+        self.users = [User.objects.create_user(f"voter{i}", password="abcdef") for i in range(3)]
+
+    def vote(self, user, question):
+        self.client.force_login(user)
+        self.client.post(reverse('polls:ballot'),
+                         {f'question_{question.id}': question.choice_set.get().id})
+
+    def test_votes_move_polls_up(self):
+        """The poll with the most recent votes is listed first."""
+        for user in self.users:
+            self.vote(user, self.questions[1])
+        self.vote(self.users[0], self.questions[2])
+        get_counter().flush()
+        response = self.client.get(reverse('polls:index'), {'order': 'trending'})
+        self.assertEqual(list(response.context['latest_question_list'])[:2],
+                         [self.questions[1], self.questions[2]])
+        self.assertEqual(response.context['order'], 'trending')
+
+    def test_default_order_is_latest(self):
+        """Without ?order the index still lists the newest polls first."""
+        response = self.client.get(reverse('polls:index'))
+        self.assertEqual(response.context['order'], 'latest')
+        self.assertContains(response, '?order=trending')
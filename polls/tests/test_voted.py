@@ -0,0 +1,112 @@
+import datetime
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from polls.ballot import record_votes
+from polls.models import Question, Vote
+from polls.voted import VotedIndex, get_voted_index
+
+
+def create_question(question_text, days=1):
+    """Create a question that closes the given number of `days` from now."""
+    now = timezone.now()
+    question = Question.objects.create(question_text=question_text, pub_date=now - datetime.timedelta(days=2),
+                                       end_date=now + datetime.timedelta(days=days))
+    question.choice_set.create(choice_text="Yes")
+    question.choice_set.create(choice_text="No")
+    return question
+
+
+class VotedIndexTests(TestCase):
+    """Test the per-choice bitsets of who voted."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("Firstykus44", password="abcdef")
+        self.question = create_question("Indexed poll")
+        self.yes, self.no = self.question.choice_set.order_by('id')
+
+    def test_rebuild_from_votes(self):
+        """Existing votes on open polls are loaded with one query."""
+        Vote.objects.create(user=self.user, question=self.question, selected_choice=self.no)
+        closed = create_question("Closed poll", days=-1)
+        Vote.objects.create(user=self.user, question=closed, selected_choice=closed.choice_set.first())
+        index = VotedIndex(max_age=60)
+        with self.assertNumQueries(1):
+            self.assertEqual(index.current_choice(self.user.pk, self.question.id), self.no.id)
+            self.assertEqual(index.voted(self.user.pk, [self.question.id, closed.id]), {self.question.id})
+
+    def test_record_moves_vote(self):
+        """Changing a vote clears the old choice's bit."""
+        index = VotedIndex(max_age=60)
+        index.rebuild()
+        index.record(1000, self.question.id, self.yes.id)
+        index.record(1000, self.question.id, self.no.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(index.current_choice(1000, self.question.id), self.no.id)
+            self.assertIsNone(index.current_choice(999, self.question.id))
+
+    def test_stale_index_refreshed_once_in_background(self):
+        """Stale lookups use the old bitsets and start a single background rebuild."""
+        index = VotedIndex(max_age=0)
+        self.assertEqual(index.voted(self.user.pk, [self.question.id]), set())
+        Vote.objects.create(user=self.user, question=self.question, selected_choice=self.yes)
+        with mock.patch.object(index, '_start_refresh') as start_refresh:
+            with self.assertNumQueries(0):
+                for _ in range(5):
+                    self.assertEqual(index.voted(self.user.pk, [self.question.id]), set())
+            start_refresh.assert_called_once_with()
+            index.rebuild()
+            self.assertEqual(index.current_choice(self.user.pk, self.question.id), self.yes.id)
+
+    def test_votes_during_rebuild_are_kept(self):
+        """A vote recorded while the index is being reloaded survives the swap."""
+        index = VotedIndex(max_age=60)
+        now = timezone.now()
+
+        def record_during_load():
+            index.record(1000, self.question.id, self.no.id)
+            return now
+
+        with mock.patch('polls.voted.timezone.now', side_effect=record_during_load):
+            index.rebuild()
+        self.assertEqual(index.current_choice(1000, self.question.id), self.no.id)
+
+
+class VotedViewTests(TestCase):
+    """Test marking voted polls on the index and detail pages."""
+
+    def setUp(self):
+        get_voted_index().clear()
+        self.addCleanup(get_voted_index().clear)
+        self.user = User.objects.create_user("Firstykus44", password="abcdef")
+        self.questions = [create_question(f"Poll {i}") for i in range(3)]
+        self.client.force_login(self.user)
+
+    def test_vote_on_one_of_many_polls(self):
+        """Voting on one poll redirects to its results and leaves the others alone."""
+        question = self.questions[1]
+        response = self.client.post(reverse('polls:vote', args=(question.id,)),
+                                    {'choice': question.choice_set.first().id})
+        self.assertRedirects(response, reverse('polls:results', args=(question.id,)))
+
+    def test_index_marks_voted_polls_without_queries(self):
+        """The index marks voted polls with no per-poll vote lookups."""
+        record_votes(self.user, [self.questions[0].choice_set.first()])
+        response = self.client.get(reverse('polls:index'))
+        self.assertEqual(response.context['voted'], {self.questions[0].id})
+        self.assertContains(response, '(voted)', count=1)
+        with self.assertNumQueries(3):
+            self.client.get(reverse('polls:index'))
+
+    def test_detail_shows_current_choice(self):
+        """The detail page shows and preselects the user's current choice."""
+        choice = self.questions[2].choice_set.last()
+        record_votes(self.user, [choice])
+        response = self.client.get(reverse('polls:detail', args=(self.questions[2].id,)))
+        self.assertEqual(response.context['current_choice'], choice)
+        self.assertContains(response, 'Your current vote is No')
+        self.assertContains(response, 'checked')
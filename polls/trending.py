@@ -0,0 +1,102 @@
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Abs, Greatest, Log, Power
+from django.dispatch import receiver
+
+from .models import Question
+from .signals import ballot_cast
+
+
+def combine(first, second):
+    """Return ``log2(2 ** first + 2 ** second)`` without overflowing."""
+    if first is None:
+        return second
+    high, low = max(first, second), min(first, second)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def vote_key(now, half_life):
+    """Key of one vote cast at ``now``."""
+    return now / half_life
+
+
+def score(key, now, half_life):
+    """Decayed number of votes represented by ``key`` at time ``now``."""
+    return 2 ** (key - now / half_life)
+
+
+class TrendingCounter:
+    """Exponentially decayed vote counts per question, in log space.
+
+    A question's ``trending`` value is ``log2(sum(2 ** (t / half_life)))``
+    over the times ``t`` of its votes. Its decayed score at time ``now`` is
+    ``2 ** (trending - now / half_life)``, which shrinks at the same rate
+    for every question, so ordering by the stored column orders by current
+    score with no rescoring. New votes are folded in memory and written
+    every POLLS_TRENDING_FLUSH_SECONDS with one UPDATE per question.
+    """
+
+    def __init__(self, half_life):
+        self.half_life = half_life
+        self._pending = {}
+        self._flushed = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, question_id, now=None):
+        """Count one vote for ``question_id``."""
+        key = vote_key(time.time() if now is None else now, self.half_life)
+        with self._lock:
+            self._pending[question_id] = combine(self._pending.get(question_id), key)
+
+    def flush(self):
+        """Fold the pending votes into ``Question.trending``."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flushed = time.monotonic()
+        for question_id, key in pending.items():
+            key = Value(key, output_field=FloatField())
+            Question.objects.filter(pk=question_id).update(
+                trending=Greatest(F('trending'), key) + Log(2, 1 + Power(2, -Abs(F('trending') - key))))
+        return len(pending)
+
+    def flush_if_due(self, interval):
+        """Flush when the last flush is ``interval`` seconds old."""
+        if time.monotonic() - self._flushed >= interval:
+            self.flush()
+
+
+_counter = None
+_counter_lock = threading.Lock()
+
+
+def get_counter():
+    """Return the process-wide trending counter."""
+    global _counter
+    if _counter is None:
+        with _counter_lock:
+            if _counter is None:
+                _counter = TrendingCounter(settings.POLLS_TRENDING_HALF_LIFE)
+    return _counter
+
+
+@receiver(setting_changed)
+def reset_counter(setting, **kwargs):
+    """Write out pending votes and rebuild the counter when its settings change."""
+    global _counter
+    if setting.startswith('POLLS_TRENDING_') and _counter is not None:
+        _counter.flush()
+        _counter = None
+
+
+@receiver(ballot_cast)
+def count_trending_votes(sender, changes, **kwargs):
+    """Count every recorded vote towards its question's trending score."""
+    counter = get_counter()
+    for question_id, _, _ in changes:
+        counter.record(question_id)
+    counter.flush_if_due(settings.POLLS_TRENDING_FLUSH_SECONDS)
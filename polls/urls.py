@@ -8,4 +8,8 @@ urlpatterns = [
     path('<int:pk>/', views.DetailView.as_view(), name='detail'),
     path('<int:pk>/results/', views.ResultsView.as_view(), name='results'),
     path('<int:question_id>/vote/', views.vote, name='vote'),
+    path('ballot/', views.ballot, name='ballot'),
+    path('search/', views.search, name='search'),
+    path('admission/', views.admission, name='admission'),
+    path('analytics/<int:first_id>/<int:second_id>/', views.analytics, name='analytics'),
 ]
@@ -0,0 +1,7 @@
+def get_client_ip(request):
+    """Get the client's ip address."""
+
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        return x_forwarded_for.split(',')[-1].strip()
+    return request.META.get('REMOTE_ADDR')
@@ -1,58 +1,43 @@
-from django.http import HttpResponseRedirect
+from django.conf import settings
+from django.http import Http404, HttpResponseRedirect, JsonResponse
 from django.shortcuts import get_object_or_404, render
 from django.urls import reverse
 from django.views import generic
 from django.utils import timezone
 from django.contrib import messages
 from django.core.exceptions import ObjectDoesNotExist
-from django.dispatch import receiver
-from django.contrib.auth.signals import user_logged_in, user_logged_out, user_login_failed
 from django.contrib.auth.decorators import login_required
-from .models import Choice, Question, Vote
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import ImproperlyConfigured
+from django.core.paginator import Paginator
+from django.contrib.auth.views import LoginView
+from django.utils.decorators import method_decorator
+from .admission import get_controller
+from .idempotency import new_key, release, replay
+from .ballot import cast_ballot, record_votes
+from .models import Choice, Question
+from .ratelimit import ratelimit
+from .routers import pin_primary, replica_for
+from .search import SearchResults
+from .tallies import load_votes
+from .voted import get_voted_index
 from datetime import datetime
 import logging
 
 log = logging.getLogger("ku-polls")
-logging.basicConfig(level=logging.INFO)
 
-def get_client_ip(request):
-    """Get the client's ip address."""
 
-    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-    if x_forwarded_for:
-        return x_forwarded_for.split(',')[-1].strip()
-    return request.META.get('REMOTE_ADDR')
+class PooledLoginView(LoginView):
+    """Login page whose attempts are rate limited per client and username.
 
-@receiver(user_logged_in)
-def update_choice_login(request, **kwargs):
-    """Update the last vote after user login."""
-    
-    for question in Question.objects.all():
-        try :
-            question.last_vote = str(request.user.vote_set.get(question=question).selected_choice)
-            question.save()
-        except(Vote.DoNotExist):
-            pass
-
-@receiver(user_logged_in)
-def log_user_logged_in(sender, request, user, **kwargs):
-    
-    """Logging after user login."""
-    log.info(f'Login user: {user} , IP: {get_client_ip(request)} , Date: {datetime.now()}')
-
-
-@receiver(user_logged_out)
-def log_user_logged_out(sender, request, user, **kwargs):
-    """Logging after user logout."""
-    
-    log.info(f'Logout user: {user} , IP: {get_client_ip(request)} , Date: {datetime.now()}')
+    A full login pool is answered with 503 by LoginPoolFullMiddleware.
+    """
 
+    @method_decorator(ratelimit('login', field='username'))
+    def post(self, request, *args, **kwargs):
+        """Verify the credentials."""
+        return super().post(request, *args, **kwargs)
 
-@receiver(user_login_failed)
-def log_user_login_failed(sender, request, credentials, **kwargs):
-    """Logging when user fail to login."""
-    
-    log.warning('Login user(failed): %s , IP: %s , Date: %s', credentials['username'], get_client_ip(request), str(datetime.now()))
 
 class IndexView(generic.ListView):
     """Show all activated question."""
@@ -61,8 +46,31 @@ class IndexView(generic.ListView):
     context_object_name = 'latest_question_list'
 
     def get_queryset(self):
-        """Return the last five published questions."""
-        return Question.objects.filter(pub_date__lte=timezone.now()).order_by('-pub_date')
+        """Return the published questions, newest or trending first."""
+        questions = Question.objects.using(replica_for(self.request)).filter(pub_date__lte=timezone.now())
+        if self.request.GET.get('order') == 'trending':
+            return questions.order_by('-trending', '-pub_date')
+        return questions.order_by('-pub_date')
+
+    def get_context_data(self, **kwargs):
+        """Add the ordering in use."""
+        context = super().get_context_data(**kwargs)
+        context['order'] = 'trending' if self.request.GET.get('order') == 'trending' else 'latest'
+        if self.request.user.is_authenticated:
+            context['voted'] = get_voted_index().voted(
+                self.request.user.pk, [question.id for question in context['latest_question_list']])
+        return context
+
+
+def vote_form_context(user, question):
+    """Return the choices, the user's current choice and an idempotency key."""
+    choices = list(question.choice_set.all())
+    current = get_voted_index().current_choice(user.pk, question.id) if user.is_authenticated else None
+    return {
+        'choices': choices,
+        'current_choice': next((choice for choice in choices if choice.id == current), None),
+        'idempotency_key': new_key(),
+    }
 
 
 class DetailView(generic.DetailView):
@@ -86,6 +94,12 @@ class DetailView(generic.DetailView):
         """Excludes any questions that aren't published yet."""
         return Question.objects.filter(pub_date__lte=timezone.now())
 
+    def get_context_data(self, **kwargs):
+        """Add the user's current choice and a fresh idempotency key for the vote form."""
+        context = super().get_context_data(**kwargs)
+        context.update(vote_form_context(self.request.user, self.object))
+        return context
+
 
 class ResultsView(generic.DetailView):
     """Show the result page."""
@@ -93,34 +107,135 @@ class ResultsView(generic.DetailView):
     model = Question
     template_name = 'polls/results.html'
 
+    def get_queryset(self):
+        """Read results from the replica unless the user just voted."""
+        return Question.objects.using(replica_for(self.request))
+
+    def get_context_data(self, **kwargs):
+        """Add the choices with their current tallies."""
+        context = super().get_context_data(**kwargs)
+        context['choices'] = load_votes(list(self.object.choice_set.all()))
+        return context
+
+@ratelimit('vote')
 @login_required()
 def vote(request, question_id):
     """Make the voting and redirection to result page."""
     
     user = request.user
-    question = get_object_or_404(Question, pk=question_id)
+    replayed = replay(request, reverse('polls:results', args=(question_id,)))
+    if replayed is not None:
+        return replayed
+    try:
+        question = get_object_or_404(Question, pk=question_id)
+    except Http404:
+        release(request)
+        raise
     if not question.can_vote():
+        release(request)
         return HttpResponseRedirect(reverse('polls:index'), messages.error(request, "This poll has been out of date."))
     try:
         selected_choice = question.choice_set.get(pk=request.POST['choice'])
     except (KeyError, Choice.DoesNotExist):
+        release(request)
         # Redisplay the question voting form.
         return render(request, 'polls/detail.html', {
             'question': question,
             'error_message': "You didn't select a choice.",
+            **vote_form_context(user, question),
         })
     else:
-        Vote.objects.update_or_create(user=user, question=question, defaults={'selected_choice': selected_choice})
-        for choice in question.choice_set.all():
-            choice.votes = Vote.objects.filter(question=question).filter(selected_choice=choice).count()
-            choice.save()
-        if Vote.objects.filter(question=question).filter(selected_choice=choice).count() == 0:
-            selected_choice.votes += 1
-            selected_choice.save()
-        for question in Question.objects.all():
-            question.last_vote = str(request.user.vote_set.get(question=question).selected_choice)
-            question.save()
+        try:
+            record_votes(user, [selected_choice])
+        except Exception:
+            release(request)
+            raise
+        pin_primary(request)
         date = datetime.now()
         log = logging.getLogger("polls")
         log.info("User: %s, Poll's ID: %d, Date: %s.", user, question_id, str(date))
         return HttpResponseRedirect(reverse('polls:results', args=(question.id,)))
+
+
+@ratelimit('vote')
+@login_required()
+def ballot(request):
+    """Show every open poll as one survey and vote on all of them at once."""
+
+    if request.method == 'POST':
+        # Checked before any query so repeated submissions cost nothing.
+        replayed = replay(request, reverse('polls:index'))
+        if replayed is not None:
+            return replayed
+    now = timezone.now()
+    questions = list(Question.objects.filter(pub_date__lte=now, end_date__gte=now)
+                     .order_by('pub_date').prefetch_related('choice_set'))
+    if request.method == 'POST':
+        selections = {}
+        for key, value in request.POST.items():
+            if key.startswith('question_'):
+                try:
+                    selections[int(key[len('question_'):])] = int(value)
+                except ValueError:
+                    pass
+        if not selections:
+            release(request)
+            return render(request, 'polls/ballot.html', {
+                'questions': questions,
+                'error_message': "You didn't select a choice.",
+                'idempotency_key': new_key(),
+            })
+        try:
+            errors = cast_ballot(request.user, selections)
+        except Exception:
+            release(request)
+            raise
+        pin_primary(request)
+        log.info("User: %s, Ballot polls: %s, Date: %s.", request.user, sorted(selections), str(datetime.now()))
+        if errors:
+            release(request)
+            for question in questions:
+                question.ballot_error = errors.get(question.id)
+            return render(request, 'polls/ballot.html', {
+                'questions': questions,
+                'error_message': "Some of your answers were not recorded.",
+                'idempotency_key': new_key(),
+            })
+        messages.success(request, "Your answers have been recorded.")
+        return HttpResponseRedirect(reverse('polls:index'))
+    return render(request, 'polls/ballot.html', {'questions': questions, 'idempotency_key': new_key()})
+
+
+def search(request):
+    """Show the published polls matching a full-text query, best first."""
+
+    query = request.GET.get('q', '').strip()
+    results = SearchResults(query, using=replica_for(request))
+    page_obj = Paginator(results, settings.POLLS_SEARCH_PAGE_SIZE).get_page(request.GET.get('page'))
+    return render(request, 'polls/search.html', {'query': query, 'page_obj': page_obj})
+
+
+@staff_member_required
+def analytics(request, first_id, second_id):
+    """Show how the answers to two polls relate, for staff only."""
+
+    # Imported here so NumPy is only loaded by the workers that need it.
+    from .analytics import compare_questions
+
+    using = replica_for(request)
+    first = get_object_or_404(Question.objects.using(using), pk=first_id)
+    second = get_object_or_404(Question.objects.using(using), pk=second_id)
+    context = {'first': first, 'second': second}
+    try:
+        context.update(compare_questions(first, second, using=using))
+    except ImproperlyConfigured as exc:
+        context['error_message'] = str(exc)
+    return render(request, 'polls/analytics.html', context)
+
+
+@staff_member_required
+def admission(request):
+    """Report this worker's admission control counters, for staff only."""
+
+    controller = get_controller()
+    return JsonResponse(controller.stats() if controller is not None else {})
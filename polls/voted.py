@@ -0,0 +1,166 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connection
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Vote
+from .signals import ballot_cast
+
+
+def _set_bit(bits, index):
+    """Set bit ``index``, growing ``bits`` as needed."""
+    byte = index >> 3
+    if byte >= len(bits):
+        bits.extend(bytes(byte - len(bits) + 1))
+    bits[byte] |= 1 << (index & 7)
+
+
+def _clear_bit(bits, index):
+    """Clear bit ``index`` if it is set."""
+    byte = index >> 3
+    if byte < len(bits):
+        bits[byte] &= ~(1 << (index & 7))
+
+
+def _test_bit(bits, index):
+    """Return whether bit ``index`` is set."""
+    byte = index >> 3
+    return byte < len(bits) and bool(bits[byte] >> (index & 7) & 1)
+
+
+class VotedIndex:
+    """Which users voted for which choice, for every open poll.
+
+    Each choice holds a bytearray bitset indexed by user id, so answering
+    "has this user voted here, and for what" costs no queries and about one
+    bit per user per choice. The first lookup builds the index from
+    ``Vote`` with one query. Once it is ``max_age`` seconds old a single
+    background thread reloads it, picking up votes recorded by other worker
+    processes, while lookups keep using the old copy. Votes made through
+    this process are applied as they happen.
+    """
+
+    def __init__(self, max_age):
+        self.max_age = max_age
+        self._questions = {}
+        self._built = None
+        self._refreshing = False
+        self._replay = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    @staticmethod
+    def _apply(questions, user_id, question_id, choice_id):
+        choices = questions.setdefault(question_id, {})
+        for other_id, bits in choices.items():
+            if other_id != choice_id:
+                _clear_bit(bits, user_id)
+        _set_bit(choices.setdefault(choice_id, bytearray()), user_id)
+
+    def rebuild(self):
+        """Reload the bitsets of the open polls from the database."""
+        with self._lock:
+            self._replay = []
+        try:
+            now = timezone.now()
+            questions = {}
+            votes = Vote.objects.filter(question__pub_date__lte=now, question__end_date__gte=now,
+                                        user__isnull=False)
+            for question_id, choice_id, user_id in votes.values_list('question_id', 'selected_choice_id', 'user_id'):
+                _set_bit(questions.setdefault(question_id, {}).setdefault(choice_id, bytearray()), user_id)
+        except BaseException:
+            with self._lock:
+                self._replay = None
+                self._refreshing = False
+            raise
+        with self._lock:
+            # Votes recorded while loading may be missing from what was read.
+            for change in self._replay:
+                self._apply(questions, *change)
+            self._questions = questions
+            self._built = time.monotonic()
+            self._replay = None
+            self._refreshing = False
+
+    def _refresh(self):
+        try:
+            self.rebuild()
+        finally:
+            connection.close()
+
+    def _start_refresh(self):
+        """Rebuild the index on a background thread."""
+        threading.Thread(target=self._refresh, name='polls-voted', daemon=True).start()
+
+    def _fresh(self):
+        """Return the bitsets, building them on first use and refreshing stale ones in the background."""
+        if self._built is None:
+            with self._build_lock:
+                if self._built is None:
+                    self.rebuild()
+        elif time.monotonic() - self._built >= self.max_age:
+            with self._lock:
+                start, self._refreshing = not self._refreshing, True
+            if start:
+                self._start_refresh()
+        return self._questions
+
+    def record(self, user_id, question_id, choice_id):
+        """Record that ``user_id`` now votes for ``choice_id`` on ``question_id``."""
+        with self._lock:
+            self._apply(self._questions, user_id, question_id, choice_id)
+            if self._replay is not None:
+                self._replay.append((user_id, question_id, choice_id))
+
+    def current_choice(self, user_id, question_id):
+        """Return the id of the choice ``user_id`` voted for, or None."""
+        for choice_id, bits in self._fresh().get(question_id, {}).items():
+            if _test_bit(bits, user_id):
+                return choice_id
+        return None
+
+    def voted(self, user_id, question_ids):
+        """Return the subset of ``question_ids`` that ``user_id`` voted on."""
+        questions = self._fresh()
+        return {question_id for question_id in question_ids
+                if any(_test_bit(bits, user_id) for bits in questions.get(question_id, {}).values())}
+
+    def clear(self):
+        """Drop every bitset so the next lookup rebuilds them."""
+        with self._lock:
+            self._questions = {}
+            self._built = None
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_voted_index():
+    """Return the process-wide voted index."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = VotedIndex(settings.POLLS_VOTED_MAX_AGE)
+    return _index
+
+
+@receiver(setting_changed)
+def reset_voted_index(setting, **kwargs):
+    """Rebuild the index when its settings are overridden."""
+    global _index
+    if setting.startswith('POLLS_VOTED_'):
+        _index = None
+
+
+@receiver(ballot_cast)
+def record_voted(sender, user, changes, **kwargs):
+    """Apply this process's votes to the voted index."""
+    index = get_voted_index()
+    for question_id, _, choice_id in changes:
+        index.record(user.pk, question_id, choice_id)